@@ -1,19 +1,20 @@
 import os
-import json
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import logging
-from scrapers.btcturk import BtcTurkScraper
-from scrapers.paribu import ParibuScraper
-from scrapers.bitexen import BitexenScraper
-from scrapers.bitci import BitciScraper
-from scrapers.cointr import CoinTRScraper
-from scrapers.icrypex import ICRYPEXScraper
-from scrapers.bitay import BitayScraper
-import threading
+from scrapers.exchanges import EXCHANGES
+from scrape_queue import PRIORITY_MANUAL, scrape_queue_for
+from snapshot_cache import SUPPORTED_ENCODINGS, snapshot_cache_for
+from offer_table import normalize_symbol, offer_table_for
+from offer_index import InvalidQuery, offer_index_for
+from best_rates import best_rates_for
+from apy_history import DAY_SECONDS, history_store_for
+from projection import project_returns
+from circuit_breaker import read_circuit_states
+from leader_lock import leader_lock_for
 import time
-import schedule
+import threading
 from dotenv import load_dotenv
 
 # Initialize auth modules
@@ -84,16 +85,36 @@ init_email(app)
 init_auth(app)
 init_payment(app)
 
-# List of available scrapers
-scrapers = {
-    "btcturk": BtcTurkScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR),
-    "paribu": ParibuScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR),
-    "bitexen": BitexenScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR),
-    "bitci": BitciScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR),
-    "cointr": CoinTRScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR),
-    "icrypex": ICRYPEXScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR),
-    "bitay": BitayScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR)
-}
+# Scrape requests are handed to the scraper worker (scraper_service.py)
+# through a queue in the data directory
+scrape_queue = scrape_queue_for(DATA_DIR)
+
+# "external" (the default under gunicorn) leaves scraping to a separate
+# scraper_service.py process sharing this data directory; "embedded" (the
+# default for `python app.py`, opted into by single-container deployments)
+# runs the worker in background threads of one API process
+SCRAPER_WORKER = os.environ.get('SCRAPER_WORKER', 'embedded' if __name__ == "__main__" else 'external')
+
+def run_embedded_worker():
+    # Only the API process holding the lock imports the scrapers and runs
+    # the worker; another one takes over within a minute of it exiting
+    worker_leader = leader_lock_for(DATA_DIR, "embedded_worker")
+    while not worker_leader.try_acquire():
+        time.sleep(60)
+    from scraper_service import start_background_worker
+    logger.info(f"Running the embedded scraper worker in process {os.getpid()}")
+    start_background_worker()
+
+if SCRAPER_WORKER == 'embedded':
+    threading.Thread(target=run_embedded_worker, name="embedded-worker", daemon=True).start()
+elif SCRAPER_WORKER != 'external':
+    logger.warning(f"Unknown SCRAPER_WORKER '{SCRAPER_WORKER}', expected 'embedded' or 'external'; no worker started")
+
+# Parsed exchange files and pre-serialized responses, served from memory
+rewards_snapshots = snapshot_cache_for(DATA_DIR)
+
+# APY observations recorded by the scrapers
+apy_history = history_store_for(DATA_DIR)
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
@@ -109,6 +130,18 @@ def health_check():
 def status_check():
     return health_check()
 
+# Circuit breaker state of each exchange host, as last published by the scraper worker
+@app.route('/api/health/circuits', methods=['GET'])
+def circuit_health():
+    states = read_circuit_states(DATA_DIR) or {"updatedAt": None, "hosts": {}}
+    updated_at = states["updatedAt"]
+    return jsonify({
+        "success": True,
+        "updatedAt": datetime.utcfromtimestamp(updated_at).isoformat() if updated_at else None,
+        "open": sorted(host for host, state in states["hosts"].items() if state["state"] != "closed"),
+        "data": states["hosts"]
+    })
+
 # Mock endpoints for testing scrapers
 @app.route('/api/mock/staking', methods=['GET'])
 def mock_staking():
@@ -152,23 +185,33 @@ def mock_campaigns():
         ]
     })
 
+def cached_body_response(body):
+    """
+    Serve a snapshot body with its ETag, answering If-None-Match with 304.
+
+    The body is sent in the best content coding the client accepts; the
+    compressed bytes are produced once per snapshot and reused.
+    """
+    encoding = request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+    etag = body.etag_for(encoding)
+    
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body.encoded(encoding), mimetype="application/json")
+        if encoding:
+            response.content_encoding = encoding
+    
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
 # Route to get data for all platforms
 @app.route('/api/rewards', methods=['GET'])
 def get_all_rewards():
     try:
-        all_data = []
-        
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith(".json"):
-                with open(os.path.join(DATA_DIR, filename), "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    all_data.append(data)
-        
-        return jsonify({
-            "success": True,
-            "data": all_data,
-            "count": len(all_data)
-        })
+        snapshot = rewards_snapshots.get()
+        return cached_body_response(snapshot.all_body)
     
     except Exception as e:
         logger.error(f"Error fetching all rewards: {str(e)}")
@@ -181,27 +224,187 @@ def get_all_rewards():
 @app.route('/api/rewards/<platform>', methods=['GET'])
 def get_platform_rewards(platform):
     try:
-        filename = os.path.join(DATA_DIR, f"{platform.lower()}.json")
+        snapshot = rewards_snapshots.get()
+        body = snapshot.platform_bodies.get(platform.lower())
         
-        if not os.path.exists(filename):
+        if body is None:
             return jsonify({
                 "success": False,
                 "error": f"Data for platform '{platform}' not found"
             }), 404
         
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        return cached_body_response(body)
+    
+    except Exception as e:
+        logger.error(f"Error fetching rewards for platform {platform}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": f"Failed to fetch reward data for platform '{platform}'"
+        }), 500
+
+# Route to query staking offers across all platforms
+@app.route('/api/offers', methods=['GET'])
+def query_offers():
+    try:
+        min_apy = request.args.get('min_apy', type=float)
+        max_lockup = request.args.get('max_lockup', type=float)
+        limit = request.args.get('limit', type=int)
+        exchanges = [name.strip().lower() for name in request.args.get('exchange', '').split(',') if name.strip()]
+        
+        index = offer_index_for(rewards_snapshots.get())
+        offers, next_cursor = index.query(
+            symbol=request.args.get('symbol'),
+            exchanges=exchanges,
+            min_apy=min_apy,
+            max_lockup=max_lockup,
+            feature=request.args.get('feature'),
+            sort=request.args.get('sort', 'apy').lower(),
+            limit=limit,
+            cursor=request.args.get('cursor'),
+        )
         
         return jsonify({
             "success": True,
-            "data": data
+            "data": offers,
+            "count": len(offers),
+            "nextCursor": next_cursor
         })
     
+    except InvalidQuery as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
     except Exception as e:
-        logger.error(f"Error fetching rewards for platform {platform}: {str(e)}")
+        logger.error(f"Error querying offers: {str(e)}")
         return jsonify({
             "success": False,
-            "error": f"Failed to fetch reward data for platform '{platform}'"
+            "error": "Failed to query offers"
+        }), 500
+
+# Route to get the best offers for every coin
+@app.route('/api/best-rates', methods=['GET'])
+def get_best_rates():
+    try:
+        best_rates = best_rates_for(rewards_snapshots.get())
+        return cached_body_response(best_rates.all_body)
+    
+    except Exception as e:
+        logger.error(f"Error fetching best rates: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "Failed to fetch best rates"
+        }), 500
+
+# Route to get the best offers for one coin
+@app.route('/api/best-rates/<symbol>', methods=['GET'])
+def get_symbol_best_rates(symbol):
+    try:
+        best_rates = best_rates_for(rewards_snapshots.get())
+        body = best_rates.symbol_bodies.get(normalize_symbol(symbol))
+        
+        if body is None:
+            return jsonify({
+                "success": False,
+                "error": f"No offers found for '{symbol}'"
+            }), 404
+        
+        return cached_body_response(body)
+    
+    except Exception as e:
+        logger.error(f"Error fetching best rates for {symbol}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": f"Failed to fetch best rates for '{symbol}'"
+        }), 500
+
+# Route to rank offers by projected return
+@app.route('/api/projections', methods=['GET'])
+def get_projections():
+    try:
+        amount = request.args.get('amount', type=float)
+        days = request.args.get('days', 365, type=float)
+        compound = request.args.get('compound', 'false').lower() in ('1', 'true', 'yes')
+        
+        if amount is None:
+            return jsonify({
+                "success": False,
+                "error": "Query parameter 'amount' is required"
+            }), 400
+        
+        projections = project_returns(
+            offer_table_for(rewards_snapshots.get()),
+            amount,
+            days,
+            currency=request.args.get('currency'),
+            compound=compound,
+            limit=request.args.get('limit', type=int),
+        )
+        
+        return jsonify({
+            "success": True,
+            "data": projections,
+            "count": len(projections)
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Error projecting returns: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "Failed to project returns"
+        }), 500
+
+# Route to get the recorded APY history of one coin on one platform
+@app.route('/api/history/<platform>/<symbol>', methods=['GET'])
+def get_apy_history(platform, symbol):
+    try:
+        lockup = request.args.get('lockup', type=float)
+        days = request.args.get('days', 30, type=float)
+        
+        resolution, rows = apy_history.history(
+            platform.lower(),
+            symbol,
+            lockup=lockup,
+            start=time.time() - days * DAY_SECONDS,
+            resolution=request.args.get('resolution'),
+        )
+        history = [
+            {
+                "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+                "lockupPeriod": lockup_period,
+                "min": min_apy,
+                "max": max_apy,
+                "avg": avg_apy,
+                "last": last_apy
+            }
+            for timestamp, lockup_period, min_apy, max_apy, avg_apy, last_apy in rows
+        ]
+        
+        return jsonify({
+            "success": True,
+            "resolution": resolution,
+            "data": history,
+            "count": len(history)
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Error fetching APY history for {platform}/{symbol}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": f"Failed to fetch APY history for '{symbol}' on '{platform}'"
         }), 500
 
 # Route to force an update of the data
@@ -220,24 +423,21 @@ def force_update():
         
         # Get platform from request or update all if not specified
         platform = request.args.get('platform', '').lower()
+        if platform not in EXCHANGES:
+            platform = None
         
-        if platform and platform in scrapers:
-            # Update specific platform
-            success = scrapers[platform].save_data()
-            return jsonify({
-                "success": success,
-                "message": f"Data update for platform '{platform}' {'completed' if success else 'failed'}"
-            })
-        else:
-            # Update all platforms
-            results = {}
-            for name, scraper in scrapers.items():
-                results[name] = scraper.save_data()
-            
-            return jsonify({
-                "success": True,
-                "results": results
-            })
+        # Queue the update for the scraper worker instead of scraping in this request;
+        # it joins an already queued job covering the same platform
+        job_id = scrape_queue.enqueue(platform, priority=PRIORITY_MANUAL)
+        target = f"platform '{platform}'" if platform else "all platforms"
+        
+        return jsonify({
+            "success": True,
+            "jobId": job_id,
+            "platform": platform or "all",
+            "statusUrl": f"/api/update/{job_id}",
+            "message": f"Data update for {target} queued"
+        }), 202
     
     except Exception as e:
         logger.error(f"Error during forced update: {str(e)}")
@@ -246,50 +446,56 @@ def force_update():
             "error": "Failed to update data"
         }), 500
 
-# Function to update all data
-def update_all_data():
-    logger.info("Scheduled update starting...")
-    for name, scraper in scrapers.items():
-        try:
-            success = scraper.save_data()
-            logger.info(f"Update for {name}: {'Success' if success else 'Failed'}")
-        except Exception as e:
-            logger.error(f"Error updating {name}: {str(e)}")
-    logger.info("Scheduled update completed")
-
-# Function to run the scheduler in a separate thread
-def run_scheduler():
-    # Get update interval from environment variables (default: 6 hours)
-    update_interval = int(os.environ.get('UPDATE_INTERVAL_HOURS', 6))
-    
-    # Schedule the job to run at the specified interval
-    schedule.every(update_interval).hours.do(update_all_data)
+# Route to poll the status of a queued update
+@app.route('/api/update/<int:job_id>', methods=['GET'])
+def update_status(job_id):
+    try:
+        # Same API key as for queueing updates
+        api_key = request.headers.get('X-API-Key')
+        expected_api_key = os.environ.get('API_KEY', 'test_key')
+        
+        if api_key != expected_api_key:
+            return jsonify({
+                "success": False,
+                "error": "Invalid API key"
+            }), 401
+        
+        job = scrape_queue.get(job_id)
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": f"Update job {job_id} not found"
+            }), 404
+        
+        def timestamp(value):
+            return datetime.utcfromtimestamp(value).isoformat() if value is not None else None
+        
+        return jsonify({
+            "success": True,
+            "data": {
+                "jobId": job["id"],
+                "platform": job["platform"] or "all",
+                "platforms": job["platforms"],
+                "status": job["status"],
+                "priority": job["priority"],
+                "requests": job["requests"],
+                "requestedAt": timestamp(job["requested_at"]),
+                "startedAt": timestamp(job["started_at"]),
+                "finishedAt": timestamp(job["finished_at"]),
+                "result": job["result"]
+            }
+        })
     
-    # Run the scheduler loop
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
-
-# Run the initial data update
-def initial_update():
-    logger.info("Initial data update starting...")
-    for name, scraper in scrapers.items():
-        try:
-            scraper.save_data()
-        except Exception as e:
-            logger.error(f"Error in initial update for {name}: {str(e)}")
-    logger.info("Initial data update completed")
+    except Exception as e:
+        logger.error(f"Error getting update job {job_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "Failed to get update status"
+        }), 500
 
 if __name__ == "__main__":
-    # Run initial data update
-    initial_update()
-    
-    # Start the scheduler in a background thread
-    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
-    
     # Get port from environment variable (for Heroku/production)
     port = int(os.environ.get('PORT', 5001))
     
     # Start the Flask app
-    app.run(host='0.0.0.0', port=port, debug=False) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,344 @@
+"""
+Append-only APY history of every staking offer.
+
+Each scrape appends one (exchange, symbol, lockup, timestamp, apy)
+observation per live offer to a SQLite database kept in the data
+directory's .state/ folder. Observations are never rewritten, and an index
+on (exchange, symbol, lockup, observed_at) turns every history lookup into
+an indexed range scan.
+
+The same ingest also folds each observation into hourly, daily and weekly
+rollups (count, min, max, sum and last APY per bucket), so charts and
+sparklines read a handful of pre-aggregated rows instead of raw points.
+Raw observations and hourly rollups are expired after a configurable
+number of days; daily and weekly rollups are kept.
+
+The 7-day apyTrend sparkline and the 24h dayChange written to
+data/<exchange>.json are computed from the rollups when an exchange's data
+is saved, so the API serves real history instead of random numbers and
+reading them costs nothing per request.
+"""
+
+import os
+import bisect
+import sqlite3
+import logging
+import threading
+import time
+
+from data_state import shared_for, state_path
+from offer_table import as_number, normalize_symbol
+
+logger = logging.getLogger("apy_history")
+
+DAY_SECONDS = 24 * 60 * 60
+
+# Daily points in an offer's apyTrend sparkline
+TREND_DAYS = 7
+
+# Rollup bucket sizes, finest first; weeks start on Monday (the epoch was a Thursday)
+ROLLUPS = {
+    "hour": (60 * 60, 0),
+    "day": (DAY_SECONDS, 0),
+    "week": (7 * DAY_SECONDS, 4 * DAY_SECONDS),
+}
+# Every resolution a range query can be served at, coarsest first
+RESOLUTIONS = ("week", "day", "hour", "raw")
+
+# Days raw observations and hourly rollups are kept; daily and weekly rollups are never expired
+RAW_RETENTION_DAYS = float(os.environ.get('APY_HISTORY_RAW_RETENTION_DAYS', 30))
+HOURLY_RETENTION_DAYS = float(os.environ.get('APY_HISTORY_HOURLY_RETENTION_DAYS', 365))
+
+# Fewest points a range query should return when picking its resolution
+MIN_POINTS = int(os.environ.get('APY_HISTORY_MIN_POINTS', 12))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    lockup REAL NOT NULL,
+    observed_at REAL NOT NULL,
+    apy REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_offer_time
+    ON observations (exchange, symbol, lockup, observed_at);
+CREATE INDEX IF NOT EXISTS observations_time
+    ON observations (observed_at);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    lockup REAL NOT NULL,
+    bucket REAL NOT NULL,
+    count INTEGER NOT NULL,
+    min_apy REAL NOT NULL,
+    max_apy REAL NOT NULL,
+    sum_apy REAL NOT NULL,
+    last_apy REAL NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (resolution, exchange, symbol, lockup, bucket)
+);
+CREATE INDEX IF NOT EXISTS rollups_expiry
+    ON rollups (resolution, bucket);
+"""
+
+# Fold one observation into its bucket; "last" only moves forward in time
+UPSERT_ROLLUP = """
+INSERT INTO rollups (resolution, exchange, symbol, lockup, bucket, count, min_apy, max_apy, sum_apy, last_apy, last_at)
+VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, exchange, symbol, lockup, bucket) DO UPDATE SET
+    count = count + 1,
+    min_apy = min(min_apy, excluded.min_apy),
+    max_apy = max(max_apy, excluded.max_apy),
+    sum_apy = sum_apy + excluded.sum_apy,
+    last_apy = CASE WHEN excluded.last_at >= last_at THEN excluded.last_apy ELSE last_apy END,
+    last_at = max(last_at, excluded.last_at)
+"""
+
+def offer_key(offer):
+    """Return the (symbol, lockup) pair identifying an offer within its exchange"""
+    return normalize_symbol(offer.get("symbol") or offer.get("coin")), as_number(offer.get("lockupPeriod"))
+
+def bucket_start(timestamp, resolution):
+    """Return the start of the rollup bucket holding a timestamp"""
+    size, offset = ROLLUPS[resolution]
+    return timestamp - (timestamp - offset) % size
+
+def _rollup_rows(observation):
+    exchange, symbol, lockup, observed_at, apy = observation
+    return [
+        (resolution, exchange, symbol, lockup, bucket_start(observed_at, resolution), apy, apy, apy, apy, observed_at)
+        for resolution in ROLLUPS
+    ]
+
+def _value_at(points, timestamp):
+    """Return the APY in effect at a timestamp: the last observation at or before it"""
+    position = bisect.bisect_right(points, (timestamp, float("inf")))
+    return points[position - 1][1] if position else None
+
+def flat_trend(offer):
+    """Return the (apyTrend, dayChange) of an offer without history: its current APY on every day"""
+    return [round(as_number(offer.get("apy")), 2)] * TREND_DAYS, "0.0"
+
+class ApyHistoryStore:
+    """SQLite store of APY observations with range queries and trend summaries"""
+
+    def __init__(self, path, raw_retention_days=None, hourly_retention_days=None):
+        """
+        Args:
+            path (str): Database file, created on first use
+            raw_retention_days (float, optional): Days raw observations are kept
+            hourly_retention_days (float, optional): Days hourly rollups are kept
+        """
+        self.path = path
+        self.raw_retention_days = raw_retention_days if raw_retention_days is not None else RAW_RETENTION_DAYS
+        self.hourly_retention_days = hourly_retention_days if hourly_retention_days is not None else HOURLY_RETENTION_DAYS
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets the API read while a scraper process appends
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            self._backfill_rollups()
+
+    def _backfill_rollups(self):
+        """Build rollups for observations recorded before rollups existed"""
+        if self._conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+            return
+        observations = self._conn.execute(
+            "SELECT exchange, symbol, lockup, observed_at, apy FROM observations ORDER BY observed_at"
+        )
+        rows = [row for observation in observations for row in _rollup_rows(observation)]
+        if rows:
+            self._conn.executemany(UPSERT_ROLLUP, rows)
+            logger.info(f"Backfilled {len(rows)} APY history rollup updates")
+
+    def _expire(self, now):
+        """Drop raw observations and hourly rollups older than their retention window"""
+        self._conn.execute(
+            "DELETE FROM observations WHERE observed_at < ?",
+            (now - self.raw_retention_days * DAY_SECONDS,),
+        )
+        self._conn.execute(
+            "DELETE FROM rollups WHERE resolution = 'hour' AND bucket < ?",
+            (now - self.hourly_retention_days * DAY_SECONDS,),
+        )
+
+    def retained_since(self, resolution, now=None):
+        """Return the earliest timestamp a resolution still has data for, None if it is never expired"""
+        now = now if now is not None else time.time()
+        if resolution == "raw":
+            return now - self.raw_retention_days * DAY_SECONDS
+        if resolution == "hour":
+            return now - self.hourly_retention_days * DAY_SECONDS
+        return None
+
+    def record(self, exchange, offers, observed_at=None):
+        """
+        Append one observation per offer, update its rollups and expire old data.
+
+        Args:
+            exchange (str): Exchange name, e.g. "btcturk"
+            offers (list): Staking offer dicts as scraped
+            observed_at (float, optional): Unix timestamp, defaults to now
+
+        Returns:
+            int: Number of observations written
+        """
+        observed_at = observed_at if observed_at is not None else time.time()
+        rows = []
+        for offer in offers:
+            symbol, lockup = offer_key(offer)
+            if symbol:
+                rows.append((exchange, symbol, lockup, observed_at, as_number(offer.get("apy"))))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO observations (exchange, symbol, lockup, observed_at, apy) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(UPSERT_ROLLUP, [rollup for row in rows for rollup in _rollup_rows(row)])
+            self._expire(observed_at)
+        return len(rows)
+
+    def resolution_for(self, start, end, now=None):
+        """
+        Pick the coarsest resolution that still gives MIN_POINTS points over a window.
+
+        Resolutions whose retention does not reach back to start are skipped;
+        if none gives enough points, the finest one that covers start is used.
+        """
+        covering = [
+            resolution for resolution in RESOLUTIONS
+            if self.retained_since(resolution, now) is None or start >= self.retained_since(resolution, now)
+        ]
+        for resolution in covering:
+            if resolution == "raw" or (end - start) / ROLLUPS[resolution][0] >= MIN_POINTS:
+                return resolution
+        return covering[-1]
+
+    def history(self, exchange, symbol, lockup=None, start=None, end=None, resolution=None):
+        """
+        Return the APY history of one offer (or all lockups of a coin) in a time range.
+
+        Args:
+            exchange (str): Exchange name
+            symbol (str): Coin symbol
+            lockup (float, optional): Lockup period in days; None for every lockup
+            start (float, optional): Earliest Unix timestamp, defaults to 30 days before end
+            end (float, optional): Latest Unix timestamp, defaults to now
+            resolution (str, optional): "raw", "hour", "day" or "week"; picked
+                with resolution_for when omitted
+
+        Returns:
+            tuple: (resolution, list of (timestamp, lockup, min, max, avg, last)
+                tuples ordered by lockup and time); rollup rows are timestamped
+                with the start of their bucket
+
+        Raises:
+            ValueError: On an unknown resolution
+        """
+        now = time.time()
+        end = end if end is not None else now
+        start = start if start is not None else end - 30 * DAY_SECONDS
+        resolution = resolution or self.resolution_for(start, end, now)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of: {', '.join(RESOLUTIONS)}")
+
+        if resolution == "raw":
+            query = (
+                "SELECT observed_at, lockup, apy, apy, apy, apy FROM observations"
+                " WHERE exchange = ? AND symbol = ? AND observed_at BETWEEN ? AND ?"
+            )
+            params = [exchange, normalize_symbol(symbol), start, end]
+            order = " ORDER BY lockup, observed_at"
+        else:
+            query = (
+                "SELECT bucket, lockup, min_apy, max_apy, sum_apy / count, last_apy FROM rollups"
+                " WHERE resolution = ? AND exchange = ? AND symbol = ? AND bucket BETWEEN ? AND ?"
+            )
+            params = [resolution, exchange, normalize_symbol(symbol), bucket_start(start, resolution), end]
+            order = " ORDER BY lockup, bucket"
+        if lockup is not None:
+            query += " AND lockup = ?"
+            params.append(float(lockup))
+
+        with self._lock:
+            return resolution, self._conn.execute(query + order, params).fetchall()
+
+    def _last_values(self, resolution, exchange, symbol, lockup, start, end):
+        """Return (bucket, last apy) in [start, end], preceded by the last bucket before start"""
+        with self._lock:
+            before = self._conn.execute(
+                "SELECT bucket, last_apy FROM rollups"
+                " WHERE resolution = ? AND exchange = ? AND symbol = ? AND lockup = ? AND bucket < ?"
+                " ORDER BY bucket DESC LIMIT 1",
+                (resolution, exchange, symbol, lockup, start),
+            ).fetchall()
+            window = self._conn.execute(
+                "SELECT bucket, last_apy FROM rollups"
+                " WHERE resolution = ? AND exchange = ? AND symbol = ? AND lockup = ? AND bucket BETWEEN ? AND ?"
+                " ORDER BY bucket",
+                (resolution, exchange, symbol, lockup, start, end),
+            ).fetchall()
+        return before + window
+
+    def trend(self, exchange, offer, now=None):
+        """
+        Compute an offer's APY sparkline and 24h change from its rollups.
+
+        Args:
+            exchange (str): Exchange name
+            offer (dict): The staking offer
+            now (float, optional): Unix timestamp the trend ends at, defaults to now
+
+        Returns:
+            tuple: (closing APY of each of the last 7 UTC days, oldest first,
+                days before the first observation at the offer's current APY;
+                change in APY points since the same hour a day earlier, as a
+                string). An offer without history gets a flat trend and "0.0".
+        """
+        now = now if now is not None else time.time()
+        current = round(as_number(offer.get("apy")), 2)
+        symbol, lockup = offer_key(offer)
+        today = bucket_start(now, "day")
+        days = self._last_values("day", exchange, symbol, lockup, today - (TREND_DAYS - 1) * DAY_SECONDS, today) if symbol else []
+        if not days:
+            return flat_trend(offer)
+
+        trend = []
+        for day in range(TREND_DAYS - 1, -1, -1):
+            value = _value_at(days, today - day * DAY_SECONDS)
+            trend.append(round(value, 2) if value is not None else current)
+
+        latest = _value_at(days, today)
+        hours = self._last_values("hour", exchange, symbol, lockup, bucket_start(now - DAY_SECONDS, "hour"), bucket_start(now - DAY_SECONDS, "hour"))
+        previous = hours[-1][1] if hours else None
+        change = round(latest - previous, 1) + 0.0 if previous is not None else 0.0
+        return trend, f"{change:.1f}"
+
+    def annotate(self, exchange, offers, now=None, live=True):
+        """
+        Return copies of the offers with apyTrend and dayChange taken from history.
+
+        Every offer gets both fields; offers without history get a flat trend
+        and "0.0".
+
+        Args:
+            exchange (str): Exchange name
+            offers (list): Staking offers about to be saved
+            now (float, optional): Unix timestamp the trends end at, defaults to now
+            live (bool, optional): False for fallback data, which is never
+                matched against the live history of the same offers
+        """
+        annotated = []
+        for offer in offers:
+            if not isinstance(offer, dict):
+                annotated.append(offer)
+                continue
+            trend, day_change = self.trend(exchange, offer, now) if live else flat_trend(offer)
+            annotated.append(dict(offer, apyTrend=trend, dayChange=day_change))
+        return annotated
+
+def history_store_for(data_dir):
+    """Return the shared APY history store of a data directory"""
+    return shared_for(data_dir, "apy_history", lambda: ApyHistoryStore(state_path(data_dir, "apy_history.sqlite3")))
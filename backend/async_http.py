@@ -0,0 +1,309 @@
+"""
+Asyncio HTTP fetch layer for the scrapers.
+
+`async_safe_request` mirrors `utils.safe_request` (SSL fallback, retry with
+backoff within a RetryPolicy's attempt and deadline budget, no retries on
+4xx) but awaits instead of blocking, so many exchange
+pages can be in flight from a single event loop. Synchronous callers go
+through `run_sync`, which hands the coroutine to one shared background loop;
+that keeps the existing scraper `fetch_*` methods working unchanged.
+
+Every request passes through its host's circuit breaker (see
+circuit_breaker); a host whose breaker is open fails at once with
+CircuitOpenError, which the retry loops do not retry.
+"""
+
+import os
+import json
+import atexit
+import asyncio
+import threading
+import aiohttp
+from http_pool import DEFAULT_IDLE_TIMEOUT, DEFAULT_POOL_MAXSIZE, host_key, pool_stats
+from circuit_breaker import CircuitOpenError, circuit_breakers
+from retry_policy import RetryPolicy
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+}
+
+class FetchError(Exception):
+    """Raised by FetchResponse.raise_for_status for 4xx/5xx responses"""
+
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+class FetchResponse:
+    """
+    Fully-read HTTP response.
+
+    Exposes the subset of the requests.Response interface the scrapers rely on
+    (status_code, headers, content, text, json(), raise_for_status()).
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding=None, reason=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.reason = reason
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise FetchError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", self)
+
+    def __repr__(self):
+        return f"<FetchResponse [{self.status_code}]>"
+
+# One ClientSession per event loop; aiohttp sessions cannot be shared across loops
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+async def _on_request_start(session, ctx, params):
+    ctx.pool_host = host_key(str(params.url))
+
+async def _on_connection_reused(session, ctx, params):
+    pool_stats.record(getattr(ctx, 'pool_host', ''), reused=True)
+
+async def _on_connection_created(session, ctx, params):
+    pool_stats.record(getattr(ctx, 'pool_host', ''), reused=False)
+
+def _pool_trace_config():
+    """Trace config feeding connection reuse into the shared pool counters"""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_reuseconn.append(_on_connection_reused)
+    trace_config.on_connection_create_end.append(_on_connection_created)
+    return trace_config
+
+def get_session():
+    """
+    Return the shared aiohttp session for the running event loop.
+
+    The connector is sized and kept alive per host with the HTTP_POOL_*
+    settings of http_pool. Must be called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        session = _sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=DEFAULT_POOL_MAXSIZE,
+                keepalive_timeout=DEFAULT_IDLE_TIMEOUT,
+            )
+            session = aiohttp.ClientSession(connector=connector, trace_configs=[_pool_trace_config()])
+            _sessions[loop] = session
+        return session
+
+async def close_session():
+    """Close the shared session of the running event loop, if any"""
+    with _sessions_lock:
+        session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+async def fetch(url, headers=None, method='GET', params=None, timeout=30, verify_ssl=True, session=None):
+    """
+    Perform a single HTTP request and read the whole body.
+
+    Args:
+        url (str): The URL to request
+        headers (dict, optional): Request headers
+        method (str, optional): HTTP method
+        params (dict, optional): Query parameters
+        timeout (float, optional): Total request timeout in seconds
+        verify_ssl (bool, optional): Whether to verify SSL certificates
+        session (aiohttp.ClientSession, optional): Session to use instead of the shared one
+
+    Returns:
+        FetchResponse: The fully-read response
+
+    Raises:
+        aiohttp.ClientError, asyncio.TimeoutError: On transport failures
+        CircuitOpenError: If the host's circuit breaker is open
+    """
+    host = host_key(url)
+    circuit_breakers.check(host)
+    session = session or get_session()
+    try:
+        async with session.request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            ssl=None if verify_ssl else False,
+        ) as response:
+            content = await response.read()
+            try:
+                encoding = response.get_encoding()
+            except Exception:
+                encoding = None
+            fetched = FetchResponse(
+                str(response.url),
+                response.status,
+                dict(response.headers),
+                content,
+                encoding=encoding,
+                reason=response.reason,
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        circuit_breakers.record(host, False)
+        raise
+    except BaseException:
+        circuit_breakers.release(host)
+        raise
+    circuit_breakers.record(host, fetched.status_code < 500)
+    return fetched
+
+async def async_safe_request(url, headers=None, method='GET', timeout=30, max_retries=3, verify_ssl=None, session=None, policy=None):
+    """
+    Async counterpart of utils.safe_request with the same retry and SSL behaviour.
+
+    Args:
+        url (str): The URL to request
+        headers (dict, optional): Request headers
+        method (str, optional): HTTP method (GET, POST)
+        timeout (int, optional): Per-attempt timeout in seconds, cut to the policy's time left
+        max_retries (int, optional): Number of attempts, when no policy is given
+        verify_ssl (bool, optional): Whether to verify SSL certificates. If None, checks environment.
+        session (aiohttp.ClientSession, optional): Session to use instead of the shared one
+        policy (RetryPolicy, optional): Attempt and deadline budget of the request
+
+    Returns:
+        tuple: (FetchResponse or None, error_message or None)
+    """
+    if headers is None:
+        headers = DEFAULT_HEADERS
+
+    if method.upper() not in ('GET', 'POST'):
+        return None, f"Unsupported HTTP method: {method}"
+
+    # Only verify SSL in production environment unless told otherwise
+    if verify_ssl is None:
+        verify_ssl = os.environ.get('CRYPTO_ENV') == 'production'
+
+    policy = policy or RetryPolicy(attempts=max_retries)
+    error = "Deadline exceeded before the request was sent"
+    while policy.start_attempt():
+        try:
+            response = await fetch(
+                url,
+                headers=headers,
+                method=method.upper(),
+                timeout=policy.timeout(timeout),
+                verify_ssl=verify_ssl,
+                session=session,
+            )
+            response.raise_for_status()
+            return response, None
+
+        except aiohttp.ClientSSLError as e:
+            error = f"SSL Error: {str(e)}"
+            # If we're already not verifying SSL, this is a more serious issue
+            if not verify_ssl:
+                return None, error
+            # Try again without SSL verification right away
+            verify_ssl = False
+            continue
+
+        except aiohttp.ClientConnectionError as e:
+            error = f"Connection Error: {str(e)}"
+
+        except asyncio.TimeoutError as e:
+            error = f"Timeout Error: {str(e) or 'request timed out'}"
+
+        except CircuitOpenError as e:
+            # The host is known to be down; retrying would only wait
+            return None, f"Circuit Open: {str(e)}"
+
+        except FetchError as e:
+            error = f"HTTP Error: {str(e)}"
+            # Don't retry client errors (4xx)
+            if 400 <= e.response.status_code < 500:
+                return None, error
+
+        except Exception as e:
+            error = f"Request Error: {str(e)}"
+
+        # Back off, unless that would leave no time for another attempt
+        if not await policy.wait():
+            break
+
+    # If we've exhausted the attempts or the deadline
+    return None, error
+
+class _BackgroundLoop:
+    """Event loop running forever in a daemon thread, shared by all sync callers"""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def get_loop(self):
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="async-http-loop",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def in_loop_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def shutdown(self):
+        """Close the loop's shared session and stop the loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or not thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(close_session(), loop).result(5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+
+_background_loop = _BackgroundLoop()
+atexit.register(_background_loop.shutdown)
+
+def run_sync(coro, timeout=None):
+    """
+    Run a coroutine on the shared background loop and block for its result.
+
+    This is the migration shim for synchronous scraper code: concurrent
+    callers (e.g. the scrape orchestrator's worker threads) all multiplex
+    onto one loop and one connection pool instead of each holding a socket.
+
+    Args:
+        coro (coroutine): The coroutine to run
+        timeout (float, optional): Seconds to wait for the result
+
+    Returns:
+        The coroutine's return value
+    """
+    if _background_loop.in_loop_thread():
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the async_http loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop.get_loop())
+    return future.result(timeout)
@@ -0,0 +1,137 @@
+"""
+Materialized best-rate table: the top staking offers per coin across exchanges.
+
+"Which exchange pays the most for coin X" is answered from a table kept
+per normalized symbol, holding the best BEST_RATES_TOP_N offers with their
+APY, lockup and minimum. The table is updated incrementally from rewards
+snapshots: the snapshot cache reuses the parsed data of files that did not
+change, so only exchanges whose data object changed are re-ranked, and only
+the symbols those exchanges list (now or before) are merged again. Every
+symbol's response body is serialized when its ranking changes, so a lookup
+is a dictionary access.
+"""
+
+import os
+import heapq
+import threading
+
+from offer_table import as_number, normalize_symbol
+from snapshot_cache import CachedBody, serialize
+
+# Offers kept per coin symbol
+DEFAULT_TOP_N = int(os.environ.get('BEST_RATES_TOP_N', 3))
+
+def _rank_key(entry):
+    # Highest APY first, then the shortest lockup, then exchange name for stability
+    return (-as_number(entry["apy"]), as_number(entry["lockupPeriod"]), entry["exchange"])
+
+def _exchange_entries(exchange, data):
+    """Return {symbol: ranked entries} for one exchange's data file"""
+    by_symbol = {}
+    for offer in data.get("stakingOffers") or []:
+        if not isinstance(offer, dict):
+            continue
+        symbol = normalize_symbol(offer.get("symbol") or offer.get("coin"))
+        if not symbol:
+            continue
+        by_symbol.setdefault(symbol, []).append({
+            "exchange": exchange,
+            "platform": data.get("platform", exchange),
+            "coin": offer.get("coin", symbol),
+            "symbol": symbol,
+            "apy": offer.get("apy"),
+            "lockupPeriod": offer.get("lockupPeriod"),
+            "minStaking": offer.get("minStaking"),
+        })
+    for entries in by_symbol.values():
+        entries.sort(key=_rank_key)
+    return by_symbol
+
+class BestRates:
+    """Immutable best-rate table of one snapshot version"""
+
+    def __init__(self, version, rates, symbol_bodies):
+        """
+        Args:
+            version (int): Version of the rewards snapshot the table reflects
+            rates (dict): Symbol to its ranked best offers
+            symbol_bodies (dict): Symbol to the CachedBody served for it
+        """
+        self.version = version
+        self.rates = rates
+        self.symbol_bodies = symbol_bodies
+        self.all_body = CachedBody(serialize({
+            "success": True,
+            "data": rates,
+            "count": len(rates),
+        }))
+
+class BestRateTable:
+    """Keeps the best-rate table in step with the rewards snapshots"""
+
+    def __init__(self, top_n=None):
+        """
+        Args:
+            top_n (int, optional): Offers kept per symbol, defaults to BEST_RATES_TOP_N
+        """
+        self.top_n = top_n or DEFAULT_TOP_N
+        self._lock = threading.Lock()
+        self._sources = {}  # exchange -> data object its entries were built from
+        self._entries = {}  # exchange -> {symbol: ranked entries}
+        self._current = BestRates(None, {}, {})
+
+    def _merge(self, symbol):
+        lists = [entries[symbol] for entries in self._entries.values() if symbol in entries]
+        return list(heapq.merge(*lists, key=_rank_key))[:self.top_n]
+
+    def update(self, snapshot):
+        """
+        Bring the table up to date with a rewards snapshot.
+
+        Args:
+            snapshot (RewardsSnapshot): The latest snapshot
+
+        Returns:
+            BestRates: The table for that snapshot
+        """
+        current = self._current
+        if current.version == snapshot.version:
+            return current
+
+        with self._lock:
+            current = self._current
+            if current.version == snapshot.version:
+                return current
+
+            changed_symbols = set()
+            for exchange in set(self._sources) - set(snapshot.platforms):
+                changed_symbols.update(self._entries.pop(exchange))
+                del self._sources[exchange]
+            for exchange, data in snapshot.platforms.items():
+                if self._sources.get(exchange) is data:
+                    continue
+                changed_symbols.update(self._entries.get(exchange, ()))
+                self._entries[exchange] = _exchange_entries(exchange, data)
+                self._sources[exchange] = data
+                changed_symbols.update(self._entries[exchange])
+
+            # Copy-on-write, so readers of the previous table are not affected
+            rates = dict(current.rates)
+            symbol_bodies = dict(current.symbol_bodies)
+            for symbol in changed_symbols:
+                best = self._merge(symbol)
+                if best:
+                    rates[symbol] = best
+                    symbol_bodies[symbol] = CachedBody(serialize({"success": True, "symbol": symbol, "data": best}))
+                else:
+                    rates.pop(symbol, None)
+                    symbol_bodies.pop(symbol, None)
+
+            self._current = BestRates(snapshot.version, rates, symbol_bodies)
+            return self._current
+
+_table = BestRateTable()
+
+def best_rates_for(snapshot):
+    """Return the best-rate table of a rewards snapshot"""
+    return _table.update(snapshot)
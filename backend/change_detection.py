@@ -0,0 +1,138 @@
+"""
+Content hashing used to skip work on unchanged pages and output.
+
+Most scheduled runs fetch byte-identical exchange pages and produce the
+same offers. Hashing the raw response body lets a scraper reuse its
+previous parse, and hashing the normalized output (volatile timestamps
+removed) lets it skip rewriting data/<exchange>.json,
+which in turn leaves every mtime-based cache downstream untouched.
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import threading
+
+from data_state import shared_for, state_path
+from snapshot_writer import write_atomic
+
+# Fields that change on every run without the offer itself changing
+VOLATILE_FIELDS = frozenset(["lastUpdated", "updated_at"])
+
+def hash_bytes(content):
+    """Return the hex SHA-256 of raw bytes (or text, encoded as UTF-8)"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content or b"").hexdigest()
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {key: _strip_volatile(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+def normalized_output_hash(data):
+    """
+    Return a stable hash of scraper output with volatile fields removed.
+
+    Args:
+        data (dict): The data about to be written to data/<exchange>.json
+
+    Returns:
+        str: Hex SHA-256 of the canonical JSON encoding
+    """
+    canonical = json.dumps(_strip_volatile(data), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hash_bytes(canonical)
+
+class OutputHashStore:
+    """
+    Last written normalized output hash per exchange, persisted in the data directory.
+
+    Every process writing to the directory (the worker threads of each API
+    process, a separate scraper worker) shares the file, so it is re-read
+    under a file lock whenever another process has changed it, and updated
+    by read-modify-write under an exclusive lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._signature = None  # (inode, mtime_ns, size) of the file last read
+
+    def _reload(self):
+        """Re-read the file if another process changed it; call with the file lock held"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._hashes, self._signature = {}, None
+            return
+        # Every rewrite replaces the file, so the inode changes even within one mtime tick
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._hashes = json.load(f)
+        except (OSError, ValueError):
+            self._hashes = {}
+        self._signature = signature
+
+    def _file_lock(self, mode):
+        lock_file = open(f"{self.path}.lock", "a")
+        fcntl.flock(lock_file, mode)
+        return lock_file
+
+    def unchanged(self, name, output_hash):
+        """Return True if the exchange's last written output had this hash"""
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._reload()
+            return self._hashes.get(name) == output_hash
+
+    def remember(self, name, output_hash):
+        """Record the hash of the output just written for an exchange"""
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            # Keep the entries other processes wrote since the last read
+            self._reload()
+            self._hashes[name] = output_hash
+            write_atomic(self.path, json.dumps(self._hashes).encode("utf-8"))
+            stat = os.stat(self.path)
+            self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class ScrapeCounters:
+    """Thread-safe counters of fetch, parse and write work done or skipped"""
+
+    FIELDS = (
+        "pages_fetched",
+        "parses_skipped_not_modified",
+        "parses_skipped_unchanged_body",
+        "writes",
+        "writes_skipped_unchanged",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **increments):
+        with self._lock:
+            for field, amount in increments.items():
+                self._counts[field] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    @staticmethod
+    def delta(before, after):
+        """Return the per-field difference between two snapshots"""
+        return {field: after[field] - before.get(field, 0) for field in after}
+
+# Process-wide counters; callers diff snapshots to get per-run numbers
+scrape_counters = ScrapeCounters()
+
+def output_hash_store_for(data_dir):
+    """Return the shared output hash store of a scraper data directory"""
+    return shared_for(data_dir, "output_hashes", lambda: OutputHashStore(state_path(data_dir, "output_hashes.json")))
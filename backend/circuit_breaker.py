@@ -0,0 +1,209 @@
+"""
+Per-host circuit breakers for the scraper fetch paths.
+
+Every request to an exchange host through the aiohttp layer (async_http)
+first asks that host's breaker for permission and then reports whether the
+host answered:
+
+- closed: requests go through; CIRCUIT_FAILURE_THRESHOLD consecutive
+  failures (connection errors, timeouts, 5xx responses) open the breaker
+- open: requests fail immediately with CircuitOpenError, so a scraper falls
+  back to its previous or static data instead of sleeping through retries,
+  until CIRCUIT_RESET_TIMEOUT seconds have passed
+- half-open: a single probe request is let through; its success closes the
+  breaker, its failure opens it again for another timeout
+
+A 4xx response counts as the host being up. Breakers are kept per process;
+the scraper worker publishes a host's state to data/.state/circuit_breakers.json
+on each of its transitions, for the API to report. Several workers share the
+file: each one merges the hosts that changed into it under a file lock, so a
+process never overwrites the states other processes published.
+"""
+
+import os
+import json
+import time
+import fcntl
+import logging
+import threading
+
+from data_state import state_path
+from snapshot_writer import write_atomic
+
+logger = logging.getLogger("circuit_breaker")
+
+DEFAULT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+DEFAULT_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_RESET_TIMEOUT', 300))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+STATE_FILE = "circuit_breakers.json"
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"Circuit open for {host}, retrying in {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker of a single host"""
+
+    def __init__(self, host, failure_threshold=None, reset_timeout=None):
+        """
+        Args:
+            host (str): The scheme://host key the breaker guards
+            failure_threshold (int, optional): Consecutive failures that open the breaker
+            reset_timeout (float, optional): Seconds the breaker stays open before a probe
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold or DEFAULT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else DEFAULT_RESET_TIMEOUT
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self, now):
+        """Return True if a request may be sent, moving an expired open breaker to half-open"""
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state, self._probing = HALF_OPEN, False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_after(self, now):
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - now)
+
+    def record(self, success, now):
+        """
+        Record the outcome of a request.
+
+        Returns:
+            bool: Whether the breaker changed state
+        """
+        previous = self.state
+        if success:
+            self.state, self.failures, self.opened_at = CLOSED, 0, None
+        else:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = OPEN, now
+        self._probing = False
+        return self.state != previous
+
+    def release(self):
+        """Let another probe through after one that ended without an outcome"""
+        self._probing = False
+
+    def stats(self, now):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retryAfter": round(self.retry_after(now), 1),
+        }
+
+class BreakerRegistry:
+    """Circuit breakers of every host the process fetches from"""
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._state_path = None
+
+    def _breaker(self, host):
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def check(self, host):
+        """
+        Ask for permission to send a request to a host.
+
+        Raises:
+            CircuitOpenError: If the host's breaker is open (or already probing)
+        """
+        now = time.monotonic()
+        with self._lock:
+            breaker = self._breaker(host)
+            if not breaker.allow(now):
+                raise CircuitOpenError(host, breaker.retry_after(now))
+
+    def record(self, host, success):
+        """Report whether a request to a host got an answer from it"""
+        now = time.monotonic()
+        with self._lock:
+            breaker = self._breaker(host)
+            changed = breaker.record(success, now)
+            if changed:
+                logger.warning(f"Circuit for {host} is now {breaker.state} after {breaker.failures} failures")
+                self._publish_locked(now, [host])
+
+    def release(self, host):
+        """Report a request that ended without telling whether the host is up"""
+        with self._lock:
+            self._breaker(host).release()
+
+    def stats(self):
+        """Return {host: {"state", "failures", "rejected", "retryAfter"}}"""
+        now = time.monotonic()
+        with self._lock:
+            return {host: breaker.stats(now) for host, breaker in self._breakers.items()}
+
+    def publish_to(self, data_dir):
+        """
+        Publish breaker transitions to a data directory's .state/ folder.
+
+        Only the process that fetches (the scraper worker) should call this.
+        """
+        with self._lock:
+            self._state_path = state_path(data_dir, STATE_FILE)
+            self._publish_locked(time.monotonic(), list(self._breakers))
+
+    def _publish_locked(self, now, hosts):
+        """Merge the states of some hosts into the published file"""
+        if self._state_path is None or not hosts:
+            return
+        try:
+            with open(f"{self._state_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    states = (_read_states(self._state_path) or {}).get("hosts", {})
+                    states.update({host: self._breakers[host].stats(now) for host in hosts})
+                    payload = {"updatedAt": time.time(), "hosts": states}
+                    write_atomic(self._state_path, json.dumps(payload).encode("utf-8"))
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError as e:
+            logger.error(f"Error publishing circuit breaker states: {str(e)}")
+
+def _read_states(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def read_circuit_states(data_dir):
+    """
+    Return the breaker states last published to a data directory.
+
+    Returns:
+        dict or None: {"updatedAt", "hosts"}, or None if none were published
+    """
+    return _read_states(state_path(data_dir, STATE_FILE))
+
+# The process-wide registry
+circuit_breakers = BreakerRegistry()
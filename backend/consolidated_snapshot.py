@@ -0,0 +1,134 @@
+"""
+Consolidated, versioned snapshot of every exchange file.
+
+Besides the per-exchange data/<exchange>.json files, every snapshot write
+(see snapshot_writer) publishes all exchanges together under data/snapshot/:
+
+- rewards.json: {"version": N, "platforms": {name: data}}, compact JSON
+- rewards.msgpack: the same data in a binary layout the API can mmap
+
+The binary file starts with an 8-byte magic and a 4-byte big-endian header
+length, followed by a msgpack header {"version": N, "platforms": {name:
+[offset, length, digest]}} and one msgpack blob per exchange. A reader maps
+the file, unpacks only the header and decodes an exchange's blob when it is
+asked for, so a process that already holds an exchange with the same digest
+never decodes it again. Loading every exchange is a single file read either
+way.
+
+msgpack is optional; without it only rewards.json is written and read.
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+import logging
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger("consolidated_snapshot")
+
+# Whether rewards.msgpack can be written and read
+BINARY_SUPPORTED = msgpack is not None
+
+SNAPSHOT_DIR = "snapshot"
+JSON_FILE = "rewards.json"
+BINARY_FILE = "rewards.msgpack"
+
+MAGIC = b"RWSNAP1\n"
+_HEADER_LENGTH = struct.Struct(">I")
+
+def digest(blob):
+    """Return the digest stored for an exchange's encoded blob"""
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+def encode_binary(version, platforms):
+    """
+    Encode platforms in the binary layout described above.
+
+    Returns:
+        bytes: The complete rewards.msgpack content
+    """
+    blobs, index, offset = [], {}, 0
+    for name in sorted(platforms):
+        blob = msgpack.packb(platforms[name], use_bin_type=True)
+        index[name] = [offset, len(blob), digest(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    header = msgpack.packb({"version": version, "platforms": index}, use_bin_type=True)
+    return b"".join([MAGIC, _HEADER_LENGTH.pack(len(header)), header] + blobs)
+
+class ConsolidatedSnapshot:
+    """A loaded consolidated snapshot whose exchanges are decoded on access"""
+
+    def __init__(self, version, digests, decode):
+        """
+        Args:
+            version (int): Snapshot version
+            digests (dict): Exchange name to a digest of its encoded data
+            decode (callable): Returns the data of one exchange by name
+        """
+        self.version = version
+        self.digests = digests
+        self._decode = decode
+
+    def platform(self, name):
+        return self._decode(name)
+
+def _open_binary(path):
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(MAGIC)] != MAGIC:
+        mapped.close()
+        raise ValueError("Not a consolidated rewards snapshot")
+    header_start = len(MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack(mapped[len(MAGIC):header_start])
+    header = msgpack.unpackb(mapped[header_start:header_start + header_length], raw=False)
+    base = header_start + header_length
+    index = header["platforms"]
+
+    def decode(name):
+        offset, length, _ = index[name]
+        return msgpack.unpackb(mapped[base + offset:base + offset + length], raw=False)
+
+    # The mapping stays valid after the file is replaced; it is released with the snapshot
+    return ConsolidatedSnapshot(
+        header["version"],
+        {name: entry[2] for name, entry in index.items()},
+        decode,
+    )
+
+def _open_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    platforms = payload["platforms"]
+    return ConsolidatedSnapshot(
+        payload["version"],
+        # No cheap content digest: every exchange counts as changed
+        {name: None for name in platforms},
+        platforms.__getitem__,
+    )
+
+def open_consolidated(data_dir):
+    """
+    Open the consolidated snapshot of a data directory, preferring the binary form.
+
+    Returns:
+        ConsolidatedSnapshot or None: None if no readable consolidated snapshot exists
+    """
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIR)
+    candidates = [(_open_json, JSON_FILE)]
+    if BINARY_SUPPORTED:
+        candidates.insert(0, (_open_binary, BINARY_FILE))
+    for opener, filename in candidates:
+        try:
+            return opener(os.path.join(snapshot_dir, filename))
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logger.error(f"Error reading consolidated snapshot {filename}: {str(e)}")
+    return None
@@ -0,0 +1,57 @@
+"""
+Process-wide helpers for the state kept alongside a data directory.
+
+Everything other than the exchange files (queues, locks, hashes, history,
+the refresh schedule) lives in the data directory's .state/ subfolder, so
+it is never mistaken for an exchange file by the *.json scans. Each kind of
+state object is shared by the whole process: shared_for() keeps one
+instance per data directory and kind, keyed on the absolute path so that
+"data" and "/app/data" give the same instance.
+"""
+
+import os
+import threading
+
+STATE_DIR = ".state"
+
+def state_path(data_dir, name):
+    """
+    Return the path of a state file of a data directory, creating .state/ if needed.
+
+    Args:
+        data_dir (str): The data directory
+        name (str): File (or subdirectory) name inside .state/
+
+    Returns:
+        str: The absolute path
+    """
+    state_dir = os.path.join(os.path.abspath(data_dir), STATE_DIR)
+    os.makedirs(state_dir, exist_ok=True)
+    return os.path.join(state_dir, name)
+
+_instances = {}
+# Reentrant, so a factory may itself ask for another shared instance
+_instances_lock = threading.RLock()
+
+def shared_for(data_dir, kind, factory):
+    """
+    Return the process's instance of one kind of state object for a data directory.
+
+    Args:
+        data_dir (str): The data directory
+        kind (str): Name of the kind, e.g. "scrape_queue" or "leader:scheduler"
+        factory (callable): Creates the instance on first use
+
+    Returns:
+        The shared instance
+    """
+    key = (os.path.abspath(data_dir), kind)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+def existing_for(data_dir, kind):
+    """Return the instance shared_for() created for a data directory, or None"""
+    with _instances_lock:
+        return _instances.get((os.path.abspath(data_dir), kind))
@@ -0,0 +1,140 @@
+"""
+On-disk HTTP validator cache for exchange pages.
+
+For every page URL we remember the ETag / Last-Modified validators the
+exchange sent and a hash of the body, together with the data we parsed out
+of that page. The next fetch sends the validators back as If-None-Match /
+If-Modified-Since. When the exchange answers 304 Not Modified, or sends a
+body identical to last time, the previously parsed result is reused instead
+of parsing the page again.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from data_state import shared_for
+from change_detection import hash_bytes, scrape_counters
+from snapshot_writer import write_atomic
+
+logger = logging.getLogger("http_cache")
+
+def _header(headers, name):
+    """Case-insensitive header lookup that works for plain dicts too"""
+    if not headers:
+        return None
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+class ValidatorCache:
+    """URL-keyed store of HTTP validators and the result parsed from the page"""
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir (str): Directory holding one JSON entry per URL
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def lookup(self, url):
+        """
+        Return the cache entry for a URL.
+
+        Returns:
+            dict or None: Entry with url, etag, last_modified, body_hash, result and stored_at
+        """
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def conditional_headers(self, url, headers=None):
+        """
+        Return a copy of the request headers with validators for the URL added.
+
+        Validators are only sent when we still hold a parsed result to fall
+        back on, otherwise a 304 would leave us with nothing to return.
+        """
+        headers = dict(headers or {})
+        entry = self.lookup(url)
+        if entry and entry.get("result") is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def reuse_if_not_modified(self, url, response):
+        """
+        Return the previously parsed result when the page has not changed.
+
+        The page counts as unchanged on a 304, or on a 200 whose body hashes
+        the same as the body the cached result was parsed from.
+
+        Args:
+            url (str): The requested URL
+            response: Response object with status_code and content
+
+        Returns:
+            The cached parsed result, or None if the page must be parsed
+        """
+        if response is None:
+            return None
+        scrape_counters.add(pages_fetched=1)
+
+        if response.status_code == 304:
+            entry = self.lookup(url)
+            if entry is None or entry.get("result") is None:
+                logger.warning(f"Got 304 for {url} but no cached result is available")
+                return None
+            scrape_counters.add(parses_skipped_not_modified=1)
+            return entry["result"]
+
+        if response.status_code == 200:
+            entry = self.lookup(url)
+            if entry and entry.get("result") is not None and entry.get("body_hash") == hash_bytes(response.content):
+                scrape_counters.add(parses_skipped_unchanged_body=1)
+                return entry["result"]
+
+        return None
+
+    def store(self, url, response, result):
+        """
+        Remember the response validators and the result parsed from it.
+
+        The body hash is kept even when the exchange sends no validators, so
+        an identical page can still skip the parse next time.
+        """
+        etag = _header(getattr(response, "headers", None), "ETag")
+        last_modified = _header(getattr(response, "headers", None), "Last-Modified")
+
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": hash_bytes(getattr(response, "content", b"")),
+            "result": result,
+            "stored_at": datetime.utcnow().isoformat(),
+        }
+        path = self._path(url)
+        with self._lock:
+            write_atomic(path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        return True
+
+def validator_cache_for(data_dir):
+    """Return the shared validator cache stored under a scraper data directory"""
+    cache_dir = os.environ.get('HTTP_CACHE_DIR') or os.path.join(data_dir, ".http_cache")
+    return shared_for(cache_dir, "validator_cache", lambda: ValidatorCache(cache_dir))
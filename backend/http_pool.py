@@ -0,0 +1,60 @@
+"""
+Connection pool settings and reuse counters of the scraper HTTP layer.
+
+Every scraper fetches through the shared aiohttp session of async_http,
+whose connector keeps up to HTTP_POOL_MAXSIZE keep-alive connections per
+host for HTTP_POOL_IDLE_TIMEOUT seconds instead of paying a new TCP+TLS
+handshake per page. Its trace hooks report here whether each request reused
+an open connection (a hit) or had to open a new one (a miss); the scrape
+orchestrator logs the counts of every run, and the scraper worker stores
+them with each job's result.
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+# Connections kept per host and seconds an idle connection survives
+DEFAULT_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 4))
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get('HTTP_POOL_IDLE_TIMEOUT', 90))
+
+def host_key(url):
+    """Return the scheme://host[:port] key a URL is pooled under"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+class PoolStats:
+    """Connection hit/miss counters per host, shared by the whole process"""
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, reused):
+        """Record a request served over a reused (hit) or new (miss) connection"""
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"hits": 0, "misses": 0})
+            entry["hits" if reused else "misses"] += 1
+
+    def stats(self):
+        """
+        Return pool hit/miss counters per host and in total.
+
+        Returns:
+            dict: {"hosts": {host: {"hits", "misses"}}, "hits", "misses"}
+        """
+        with self._lock:
+            hosts = {host: dict(entry) for host, entry in self._hosts.items()}
+        return {
+            "hosts": hosts,
+            "hits": sum(entry["hits"] for entry in hosts.values()),
+            "misses": sum(entry["misses"] for entry in hosts.values()),
+        }
+
+    @staticmethod
+    def delta(before, after):
+        """Return the hits and misses between two stats() results"""
+        return {field: after[field] - before[field] for field in ("hits", "misses")}
+
+# The process-wide counters
+pool_stats = PoolStats()
@@ -0,0 +1,82 @@
+"""
+Leader election between the processes sharing a data directory.
+
+Every process that may run a periodic loop (the scraper worker, or the
+API when it is started directly with `python app.py`) competes for an
+exclusive, non-blocking fcntl lock on a file in the data directory's .state/
+folder. The one holding it is the leader; the others keep retrying. The
+kernel drops the lock when the leader's process exits, however it exits, so
+the next attempt by another process takes over without any lease to expire.
+"""
+
+import os
+import fcntl
+import threading
+
+from data_state import shared_for, state_path
+
+class LeaderLock:
+    """Exclusive leadership of one named role, held until released or the process exits"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Lock file, created on first use
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    @property
+    def is_leader(self):
+        return self._file is not None
+
+    def try_acquire(self):
+        """
+        Become the leader if no other holder exists.
+
+        Returns:
+            bool: Whether this instance holds leadership
+        """
+        with self._lock:
+            if self._file is not None:
+                return True
+            lock_file = open(self.path, "a+")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                # A holder that gave up may have removed the file before we
+                # locked it; a lock on a removed file guards nothing
+                if os.fstat(lock_file.fileno()).st_ino != os.stat(self.path).st_ino:
+                    raise BlockingIOError
+            except (BlockingIOError, FileNotFoundError):
+                lock_file.close()
+                return False
+            # Record the holder for whoever inspects the file
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(f"{os.getpid()}\n")
+            lock_file.flush()
+            self._file = lock_file
+            return True
+
+    def release(self, remove=False):
+        """
+        Give up leadership, if held.
+
+        Args:
+            remove (bool): Also delete the lock file, for locks named after
+                a single process that nobody will take over
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            if remove:
+                # Removed while still locked, so nobody can lock it in between
+                os.remove(self.path)
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+def leader_lock_for(data_dir, role):
+    """Return the shared leader lock of a role in a data directory"""
+    return shared_for(data_dir, f"leader:{role}", lambda: LeaderLock(state_path(data_dir, f"{role}.leader")))
@@ -0,0 +1,191 @@
+"""
+Sorted views over the offer table, answering /api/offers queries.
+
+The views are built once per rewards snapshot (so they are rebuilt exactly
+when scraper output changes): for each sort order, the row order of all
+offers and of each symbol's and exchange's offers, as int32 arrays over the
+columnar OfferTable. A query picks the narrowest view, applies its filters
+and cursor as vectorized masks over that view's columns and returns the
+first page of matching rows.
+"""
+
+import json
+import base64
+import threading
+
+import numpy as np
+
+from offer_table import normalize_symbol, offer_table_for
+
+# Sort orders /api/offers accepts, mapped to the columns they sort by (all
+# ascending, descending ones negated). Every key ends in the offer's exchange,
+# symbol, lockup and occurrence, which identify it in any snapshot, so keys are
+# unique and a cursor means the same position after a refresh.
+SORT_KEYS = {
+    "apy": lambda table, rows: (
+        -table.apy[rows], table.exchange[rows], table.symbol[rows], table.lockup[rows], table.occurrence[rows],
+    ),
+    "rating": lambda table, rows: (
+        -table.rating[rows], -table.apy[rows], table.exchange[rows], table.symbol[rows], table.lockup[rows],
+        table.occurrence[rows],
+    ),
+    "lockup": lambda table, rows: (
+        table.lockup[rows], -table.apy[rows], table.exchange[rows], table.symbol[rows], table.occurrence[rows],
+    ),
+}
+# Key elements holding exchange / symbol codes, stored by name in cursors
+_NAME_COLUMNS = {
+    "apy": {1: "exchanges", 2: "symbols"},
+    "rating": {2: "exchanges", 3: "symbols"},
+    "lockup": {2: "exchanges", 3: "symbols"},
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+class InvalidQuery(ValueError):
+    """Raised for query parameters the index cannot serve"""
+
+class OfferIndex:
+    """Per-sort row orders of one snapshot's offer table, overall and per symbol and exchange"""
+
+    def __init__(self, table):
+        """
+        Args:
+            table (OfferTable): The snapshot's offer table
+        """
+        self.table = table
+        self.version = table.version
+        all_rows = np.arange(len(table), dtype=np.int32)
+        self.views = {}
+        for sort, key in SORT_KEYS.items():
+            # lexsort takes its primary key last
+            order = all_rows[np.lexsort(key(table, all_rows)[::-1])]
+            self.views[sort] = {
+                "all": order,
+                "symbol": {code: order[table.symbol[order] == code] for code in np.unique(table.symbol).tolist()},
+                "exchange": {code: order[table.exchange[order] == code] for code in np.unique(table.exchange).tolist()},
+            }
+        # Rows listing each feature, so a feature filter is a lookup
+        self.feature_masks = table.feature_masks()
+
+    def encode_cursor(self, sort, row):
+        """Return an opaque cursor pointing just past a row in a sort order"""
+        names = _NAME_COLUMNS[sort]
+        key = []
+        for position, column in enumerate(SORT_KEYS[sort](self.table, np.array([row]))):
+            value = column[0].item()
+            if position in names:
+                value = getattr(self.table, names[position]).names[value]
+            key.append(value)
+        payload = json.dumps([sort, key], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor, sort):
+        """
+        Decode a cursor produced by encode_cursor for the given sort order.
+
+        Names are mapped to this snapshot's codes, so a cursor issued before
+        the snapshot changed still resumes at the right place.
+
+        Raises:
+            InvalidQuery: If the cursor is malformed or from another sort order
+        """
+        names = _NAME_COLUMNS[sort]
+        try:
+            cursor_sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            valid = cursor_sort == sort and len(key) == len(SORT_KEYS[sort](self.table, np.empty(0, dtype=np.int32)))
+            for position, value in enumerate(key if valid else ()):
+                if position in names:
+                    valid = valid and isinstance(value, str)
+                    if valid:
+                        key[position] = getattr(self.table, names[position]).position(value)
+                else:
+                    valid = valid and isinstance(value, (int, float)) and not isinstance(value, bool)
+        except Exception:
+            valid = False
+        if not valid:
+            raise InvalidQuery("Invalid cursor")
+        return key
+
+    def query(self, symbol=None, exchanges=None, min_apy=None, max_lockup=None, feature=None,
+              sort="apy", limit=DEFAULT_LIMIT, cursor=None):
+        """
+        Return one page of offers matching the filters.
+
+        Args:
+            symbol (str, optional): Only offers for this coin symbol
+            exchanges (list, optional): Only offers from these exchanges
+            min_apy (float, optional): Only offers paying at least this APY
+            max_lockup (float, optional): Only offers locked for at most this many days
+            feature (str, optional): Only offers listing this feature
+            sort (str, optional): "apy" (highest first), "rating" (highest first) or "lockup" (shortest first)
+            limit (int, optional): Page size, capped at MAX_LIMIT
+            cursor (str, optional): nextCursor of the previous page
+
+        Returns:
+            tuple: (list of offer dicts, next cursor or None)
+
+        Raises:
+            InvalidQuery: On an unknown sort order or a bad cursor
+        """
+        if sort not in SORT_KEYS:
+            raise InvalidQuery(f"Unknown sort '{sort}', expected one of: {', '.join(SORT_KEYS)}")
+        limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+        table = self.table
+        views = self.views[sort]
+
+        exchange_codes = [table.exchanges.codes[name] for name in exchanges or () if name in table.exchanges.codes]
+        if exchanges and not exchange_codes:
+            return [], None
+
+        # Start from the narrowest pre-sorted view that covers the query
+        if symbol:
+            rows = views["symbol"].get(table.symbols.codes.get(normalize_symbol(symbol)))
+        elif len(exchange_codes) == 1:
+            rows = views["exchange"].get(exchange_codes[0])
+        else:
+            rows = views["all"]
+        if rows is None or len(rows) == 0:
+            return [], None
+
+        keep = np.ones(len(rows), dtype=bool)
+        if min_apy is not None:
+            keep &= table.apy[rows] >= min_apy
+        if max_lockup is not None:
+            keep &= table.lockup[rows] <= max_lockup
+        if exchanges:
+            keep &= np.isin(table.exchange[rows], exchange_codes)
+        if feature:
+            if feature not in self.feature_masks:
+                return [], None
+            keep &= self.feature_masks[feature][rows]
+        if cursor:
+            # Keyset pagination: keep the rows whose sort key comes after the cursor's
+            after = np.zeros(len(rows), dtype=bool)
+            tied = np.ones(len(rows), dtype=bool)
+            for column, value in zip(SORT_KEYS[sort](table, rows), self.decode_cursor(cursor, sort)):
+                after |= tied & (column > value)
+                tied &= column == value
+            keep &= after
+
+        matches = rows[keep][:limit + 1]
+        page = [table.row(row) for row in matches[:limit]]
+        next_cursor = self.encode_cursor(sort, matches[limit - 1]) if len(matches) > limit else None
+        return page, next_cursor
+
+# (table, index) of the most recently indexed offer table
+_current = (None, None)
+_current_lock = threading.Lock()
+
+def offer_index_for(snapshot):
+    """Return the offer index of a rewards snapshot, building it on first use"""
+    global _current
+    table = offer_table_for(snapshot)
+    indexed_table, index = _current
+    if indexed_table is table:
+        return index
+    with _current_lock:
+        if _current[0] is not table:
+            _current = (table, OfferIndex(table))
+        return _current[1]
@@ -0,0 +1,162 @@
+"""
+Columnar table of every staking offer in a rewards snapshot.
+
+Offers arrive as dicts of display strings ("8.5", "30", "100 USDT", "0%"),
+re-parsed wherever they were used. The table parses them once per snapshot
+into typed NumPy columns: APY, lockup, rating, fee and minimum as float64,
+exchange, symbol and currency names as int32 codes into sorted, interned
+name lists (so comparing codes orders rows the same way as comparing
+names), and features as one flat code array with per-offer offsets.
+
+The filter, sort and ranking paths (offer_index, projection) run on these
+contiguous arrays. Offer dicts are only built for the rows a response
+returns, from a reference to the parsed offer rather than a copy.
+"""
+
+import sys
+import threading
+
+import numpy as np
+
+from scrapers.extract import extract_amount, extract_percentage
+
+def normalize_symbol(symbol):
+    """Return the symbol offers are grouped under, e.g. "usdt " -> "USDT\""""
+    return (symbol or "").strip().upper()
+
+def as_number(value):
+    """Return an offer field (e.g. "8.5") as a float, 0.0 if it is not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _minimum(offer):
+    """Return (amount, currency) of an offer's minStaking, e.g. (100.0, "USDT")"""
+    amount = extract_amount(str(offer.get("minStaking") or ""))
+    if not amount:
+        return 0.0, None
+    value, currency = amount.split(" ", 1)
+    return as_number(value), currency
+
+class Vocabulary:
+    """Sorted, interned names and their int32 codes"""
+
+    def __init__(self, names):
+        self.names = [sys.intern(name) for name in sorted(set(names))]
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    def encode(self, names):
+        return np.fromiter((self.codes[name] for name in names), dtype=np.int32, count=len(names))
+
+    def position(self, name):
+        """
+        Return the code of a name, or a half code between its sorted neighbours
+        if it is not in the vocabulary, so comparisons keep name order.
+        """
+        code = self.codes.get(name)
+        if code is not None:
+            return code
+        return np.searchsorted(np.array(self.names, dtype=object), name) - 0.5
+
+class OfferTable:
+    """Typed column arrays of every staking offer in one snapshot"""
+
+    def __init__(self, platforms, version=None):
+        """
+        Args:
+            platforms (dict): Exchange name to exchange data, as in RewardsSnapshot.platforms
+            version (int, optional): Snapshot version the table was built from
+        """
+        self.version = version
+        self._offers = []
+        exchanges, symbols, currencies, feature_lists = [], [], [], []
+        apys, lockups, ratings, fees, minimums, occurrences = [], [], [], [], [], []
+        seen = {}
+
+        for exchange in sorted(platforms):
+            for offer in platforms[exchange].get("stakingOffers") or []:
+                if not isinstance(offer, dict):
+                    continue
+                symbol = normalize_symbol(offer.get("symbol") or offer.get("coin"))
+                minimum, currency = _minimum(offer)
+                self._offers.append(offer)
+                exchanges.append(exchange)
+                symbols.append(symbol)
+                currencies.append(currency or symbol)
+                apys.append(as_number(offer.get("apy")))
+                lockups.append(as_number(offer.get("lockupPeriod")))
+                # Numbers offers an exchange lists more than once for the same coin and lockup
+                key = (exchange, symbol, lockups[-1])
+                occurrences.append(seen.get(key, 0))
+                seen[key] = occurrences[-1] + 1
+                ratings.append(as_number(offer.get("rating")))
+                fees.append(as_number(extract_percentage(str(offer.get("fees") or ""))))
+                minimums.append(minimum)
+                features = offer.get("features")
+                feature_lists.append([str(feature) for feature in features] if isinstance(features, list) else [])
+
+        self.exchanges = Vocabulary(platforms)
+        self.platform_labels = [platforms[name].get("platform", name) for name in self.exchanges.names]
+        self.symbols = Vocabulary(symbols + currencies)
+        self.feature_names = Vocabulary(feature for features in feature_lists for feature in features)
+
+        self.exchange = self.exchanges.encode(exchanges)
+        self.symbol = self.symbols.encode(symbols)
+        self.minimum_currency = self.symbols.encode(currencies)
+        self.apy = np.array(apys, dtype=np.float64)
+        self.lockup = np.array(lockups, dtype=np.float64)
+        self.rating = np.array(ratings, dtype=np.float64)
+        self.fee_rate = np.clip(np.array(fees, dtype=np.float64) / 100.0, 0.0, 1.0)
+        self.minimum = np.array(minimums, dtype=np.float64)
+        # With exchange, symbol and lockup, identifies an offer across snapshots
+        self.occurrence = np.array(occurrences, dtype=np.int32)
+
+        # Features of row i are feature_codes[feature_offsets[i]:feature_offsets[i + 1]]
+        self.feature_offsets = np.zeros(len(self._offers) + 1, dtype=np.int32)
+        np.cumsum([len(features) for features in feature_lists], out=self.feature_offsets[1:])
+        self.feature_codes = self.feature_names.encode([feature for features in feature_lists for feature in features])
+
+    def __len__(self):
+        return len(self._offers)
+
+    def feature_masks(self):
+        """Return {feature name: boolean mask of the rows listing it}, in one pass over the features"""
+        rows = np.repeat(np.arange(len(self)), np.diff(self.feature_offsets))
+        order = np.argsort(self.feature_codes, kind="stable")
+        codes, starts = np.unique(self.feature_codes[order], return_index=True)
+        masks = {}
+        for code, group in zip(codes.tolist(), np.split(rows[order], starts[1:])):
+            mask = np.zeros(len(self), dtype=bool)
+            mask[group] = True
+            masks[self.feature_names.names[code]] = mask
+        return masks
+
+    def row(self, index, **extra):
+        """
+        Return the API dict of one row: the offer with its exchange, platform
+        and normalized symbol, plus any extra fields.
+        """
+        exchange = self.exchange[index]
+        return dict(
+            self._offers[index],
+            exchange=self.exchanges.names[exchange],
+            platform=self.platform_labels[exchange],
+            symbol=self.symbols.names[self.symbol[index]],
+            **extra
+        )
+
+# (snapshot, table) of the most recently tabulated snapshot
+_current = (None, None)
+_current_lock = threading.Lock()
+
+def offer_table_for(snapshot):
+    """Return the offer table of a rewards snapshot, building it on first use"""
+    global _current
+    tabulated_snapshot, table = _current
+    if tabulated_snapshot is snapshot:
+        return table
+    with _current_lock:
+        if _current[0] is not snapshot:
+            _current = (snapshot, OfferTable(snapshot.platforms, version=snapshot.version))
+        return _current[1]
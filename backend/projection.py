@@ -0,0 +1,88 @@
+"""
+Vectorized yield projections over every staking offer.
+
+A projection for an amount and horizon is computed for every offer at once
+with array arithmetic over the typed columns of the snapshot's OfferTable,
+and ranked with a single argsort.
+
+Returns are modelled per lockup term: a locked offer only earns for the
+whole terms that fit in the horizon (with compounding, rewards are restaked
+at the end of each term), while a flexible offer earns for every day and
+compounds daily. Fees are taken as a share of the rewards earned.
+"""
+
+import numpy as np
+
+from offer_table import normalize_symbol
+
+DAYS_PER_YEAR = 365.0
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def project_returns(table, amount, days, currency=None, compound=False, limit=DEFAULT_LIMIT):
+    """
+    Project the net return of staking an amount for a number of days in every offer.
+
+    Args:
+        table (OfferTable): The snapshot's offer table
+        amount (float): Amount staked, in the offer's coin (or in currency)
+        days (float): Investment horizon in days
+        currency (str, optional): Only offers for this coin, whose minimums
+            the amount is then checked against
+        compound (bool, optional): Restake rewards at the end of each
+            lockup term (daily for flexible offers) instead of simple interest
+        limit (int, optional): Number of ranked offers to return, capped at MAX_LIMIT
+
+    Returns:
+        list: Offer dicts with grossReturn, netReturn, finalAmount, effectiveApy
+            and earningDays, best net return first
+
+    Raises:
+        ValueError: If amount or days is not positive
+    """
+    if not amount > 0 or not days > 0:
+        raise ValueError("amount and days must be positive")
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+
+    mask = np.ones(len(table), dtype=bool)
+    if currency:
+        code = table.symbols.codes.get(normalize_symbol(currency))
+        if code is None:
+            return []
+        mask &= table.symbol == code
+        # Minimums are only comparable when they are in the staked currency
+        mask &= (table.minimum_currency != code) | (table.minimum <= amount)
+    candidates = np.flatnonzero(mask)
+    if candidates.size == 0:
+        return []
+
+    apy = table.apy[candidates] / 100.0
+    lockup = table.lockup[candidates]
+    locked = lockup > 0
+
+    # A locked offer only pays out for the whole terms that fit in the horizon
+    term_days = np.where(locked, lockup, 1.0)
+    terms = np.floor(days / term_days)
+    earning_days = terms * term_days
+
+    if compound:
+        growth = np.power(1.0 + apy * term_days / DAYS_PER_YEAR, terms) - 1.0
+    else:
+        growth = apy * earning_days / DAYS_PER_YEAR
+    gross = amount * growth
+    net = gross * (1.0 - table.fee_rate[candidates])
+    effective_apy = net / amount * (DAYS_PER_YEAR / days) * 100.0
+
+    order = np.argsort(-net, kind="stable")[:limit]
+    return [
+        table.row(
+            candidates[position],
+            grossReturn=round(float(gross[position]), 8),
+            netReturn=round(float(net[position]), 8),
+            finalAmount=round(float(amount + net[position]), 8),
+            effectiveApy=round(float(effective_apy[position]), 4),
+            earningDays=float(earning_days[position]),
+        )
+        for position in order
+    ]
@@ -0,0 +1,162 @@
+"""
+Adaptive per-exchange refresh intervals.
+
+Instead of refreshing every exchange on one fixed interval, each exchange
+has its own interval, adapted to how often its normalized output (see
+change_detection) actually changes: a refresh that produced new output
+halves the interval, one that produced identical output stretches it by
+half, always within REFRESH_MIN_INTERVAL_MINUTES and
+REFRESH_MAX_INTERVAL_HOURS. Due times are jittered by up to REFRESH_JITTER
+of the interval, so exchanges that start out together drift apart instead of
+being fetched in bursts.
+
+The state (interval, next due time, change rate and the queued refresh job
+of each exchange) is kept in data/.state/refresh_schedule.json, so a new
+scheduler leader continues where the previous one stopped. Only the leader
+writes it.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+
+from data_state import shared_for, state_path
+from snapshot_writer import write_atomic
+
+logger = logging.getLogger("refresh_schedule")
+
+MIN_INTERVAL = float(os.environ.get('REFRESH_MIN_INTERVAL_MINUTES', 30)) * 60
+MAX_INTERVAL = float(os.environ.get('REFRESH_MAX_INTERVAL_HOURS', 24)) * 3600
+# Starting interval of an exchange without history
+DEFAULT_INTERVAL = float(os.environ.get('UPDATE_INTERVAL_HOURS', 6)) * 3600
+JITTER = float(os.environ.get('REFRESH_JITTER', 0.1))
+
+# Interval multipliers after a refresh that changed or did not change the output
+SHRINK = 0.5
+GROW = 1.5
+
+# Weight of the latest refresh in the moving average of the change rate
+CHANGE_RATE_WEIGHT = 0.2
+
+class RefreshSchedule:
+    """Per-exchange refresh intervals adapted to observed output changes"""
+
+    def __init__(self, path, min_interval=None, max_interval=None, default_interval=None, jitter=None):
+        """
+        Args:
+            path (str): State file, created on first save
+            min_interval (float, optional): Shortest interval in seconds
+            max_interval (float, optional): Longest interval in seconds
+            default_interval (float, optional): Interval of a new exchange in seconds
+            jitter (float, optional): Largest random share of the interval added or removed
+        """
+        self.path = path
+        self.min_interval = min_interval or MIN_INTERVAL
+        self.max_interval = max(max_interval or MAX_INTERVAL, self.min_interval)
+        self.default_interval = self._clamp(default_interval or DEFAULT_INTERVAL)
+        self.jitter = JITTER if jitter is None else jitter
+        self._lock = threading.Lock()
+        self._state = {}
+        self.reload()
+
+    def reload(self):
+        """Load the state last saved, e.g. by a previous leader"""
+        with self._lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = {}
+
+    def _clamp(self, interval):
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _next_due(self, interval, now):
+        return now + interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _entry(self, name, now):
+        if name not in self._state:
+            # Unknown exchanges are refreshed right away
+            self._state[name] = {
+                "interval": self.default_interval,
+                "due": now,
+                "changeRate": None,
+                "lastChanged": None,
+                "job": None,
+            }
+        return self._state[name]
+
+    def _save(self):
+        write_atomic(self.path, json.dumps(self._state, separators=(",", ":")).encode("utf-8"))
+
+    def due(self, names, now=None):
+        """
+        Return the exchanges whose refresh is due and not already queued.
+
+        Args:
+            names (iterable): Exchanges to consider
+            now (float, optional): Current time, defaults to time.time()
+
+        Returns:
+            list: Names of the due exchanges, most overdue first
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entries = {name: self._entry(name, now) for name in names}
+            due = [name for name, entry in entries.items() if entry["job"] is None and entry["due"] <= now]
+            return sorted(due, key=lambda name: entries[name]["due"])
+
+    def pending(self):
+        """Return {exchange: job id} of the refreshes queued and not yet observed"""
+        with self._lock:
+            return {name: entry["job"] for name, entry in self._state.items() if entry["job"] is not None}
+
+    def started(self, names, job_id):
+        """Record the queued refresh job of one or more exchanges"""
+        if isinstance(names, str):
+            names = [names]
+        now = time.time()
+        with self._lock:
+            for name in names:
+                self._entry(name, now)["job"] = job_id
+            self._save()
+
+    def observe(self, name, changed, now=None):
+        """
+        Record the outcome of an exchange's refresh and schedule the next one.
+
+        Args:
+            name (str): Exchange name
+            changed (bool or None): Whether the output changed; None if the
+                refresh failed, which leaves the interval as it was
+            now (float, optional): Current time, defaults to time.time()
+
+        Returns:
+            float: The exchange's interval in seconds
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entry(name, now)
+            entry["job"] = None
+            if changed is not None:
+                rate = entry["changeRate"]
+                entry["changeRate"] = float(changed) if rate is None else (
+                    CHANGE_RATE_WEIGHT * float(changed) + (1 - CHANGE_RATE_WEIGHT) * rate
+                )
+                entry["interval"] = self._clamp(entry["interval"] * (SHRINK if changed else GROW))
+                if changed:
+                    entry["lastChanged"] = now
+            entry["due"] = self._next_due(entry["interval"], now)
+            self._save()
+            logger.info(
+                f"Next {name} refresh in {(entry['due'] - now) / 60:.0f} min "
+                f"(interval {entry['interval'] / 60:.0f} min, change rate {entry['changeRate']})"
+            )
+            return entry["interval"]
+
+def refresh_schedule_for(data_dir):
+    """Return the shared refresh schedule of a data directory"""
+    return shared_for(data_dir, "refresh_schedule", lambda: RefreshSchedule(state_path(data_dir, "refresh_schedule.json")))
@@ -0,0 +1,122 @@
+"""
+One retry budget per HTTP request.
+
+The fetch paths each used to retry on their own terms (a fixed number of
+attempts, each with its full timeout, plus sleeps), so the worst case for
+one URL was the product of every layer. A RetryPolicy is created once per
+request and carries both limits every layer has to respect:
+
+- a total number of attempts, the first one included
+- an overall deadline: HTTP_REQUEST_DEADLINE seconds from its creation,
+  or an earlier absolute deadline handed down by the caller (the end of a
+  scrape run, see scrape_orchestrator)
+
+Each attempt's timeout is cut to the time left, and the exponential backoff
+between attempts is only slept when enough time remains for another attempt
+afterwards, so a request never outlives its deadline by more than the
+granularity of the underlying client's timeouts. An attempt that would
+start with no time left fails with DeadlineExceeded instead of getting a
+zero timeout, which aiohttp reads as no timeout at all.
+"""
+
+import os
+import time
+import random
+import asyncio
+
+# Overall seconds a request may take, all attempts and waits included
+DEFAULT_REQUEST_DEADLINE = float(os.environ.get('HTTP_REQUEST_DEADLINE', 60))
+DEFAULT_ATTEMPTS = 3
+
+# First backoff in seconds, doubled after every attempt up to MAX_BACKOFF
+BACKOFF_BASE = float(os.environ.get('HTTP_RETRY_BACKOFF', 1))
+MAX_BACKOFF = 10.0
+
+# Retries are not started with less time than this left
+MIN_ATTEMPT_SECONDS = 2.0
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised for an attempt that would start after the policy's deadline"""
+
+class RetryPolicy:
+    """Attempt and time budget shared by every retry layer of one request"""
+
+    def __init__(self, attempts=None, budget=None, deadline=None):
+        """
+        Args:
+            attempts (int, optional): Total attempts, defaults to DEFAULT_ATTEMPTS
+            budget (float, optional): Seconds the request may take, defaults to HTTP_REQUEST_DEADLINE
+            deadline (float, optional): Absolute time.monotonic() the request must
+                finish by; the earlier of this and the budget applies
+        """
+        self.attempts = attempts or DEFAULT_ATTEMPTS
+        self.deadline = time.monotonic() + (budget or DEFAULT_REQUEST_DEADLINE)
+        if deadline is not None:
+            self.deadline = min(self.deadline, deadline)
+        self.attempt = 0
+
+    def remaining(self):
+        """Return the seconds left before the deadline"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def start_attempt(self):
+        """
+        Count the next attempt.
+
+        Returns:
+            bool: False if the attempts are used up or the deadline has passed
+        """
+        if self.attempt >= self.attempts or self.remaining() <= 0:
+            return False
+        self.attempt += 1
+        return True
+
+    def timeout(self, preferred):
+        """
+        Return an attempt's timeout: the preferred one, cut to the time left.
+
+        Raises:
+            DeadlineExceeded: If no time is left, since a zero timeout would
+                mean no timeout to the HTTP clients
+
+        Examples:
+            >>> RetryPolicy(budget=60).timeout(30)
+            30
+            >>> RetryPolicy(deadline=time.monotonic()).timeout(30)  # doctest: +IGNORE_EXCEPTION_DETAIL
+            Traceback (most recent call last):
+            DeadlineExceeded: Deadline passed before the attempt could start
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline passed before the attempt could start")
+        return min(preferred, remaining)
+
+    def backoff(self):
+        """
+        Return how long to wait before the next attempt.
+
+        Returns:
+            float or None: Seconds to wait, or None if no attempt is left or
+                there would not be enough time for one after waiting
+        """
+        if self.attempt >= self.attempts:
+            return None
+        delay = min(BACKOFF_BASE * 2 ** max(self.attempt - 1, 0), MAX_BACKOFF)
+        # Jitter, so hosts failing together are not retried in lockstep
+        delay *= random.uniform(0.5, 1.0)
+        if self.remaining() - delay < MIN_ATTEMPT_SECONDS:
+            return None
+        return delay
+
+    async def wait(self):
+        """
+        Sleep out the backoff before the next attempt.
+
+        Returns:
+            bool: Whether another attempt should be made
+        """
+        delay = self.backoff()
+        if delay is None:
+            return False
+        await asyncio.sleep(delay)
+        return True
@@ -0,0 +1,195 @@
+"""
+Concurrent scrape orchestrator.
+
+Runs the staking and campaign page fetches of every exchange concurrently
+as coroutines on the shared async_http event loop, bounded by a global cap
+and a per-host cap, and saves each exchange as soon as both of its pages
+are in. A full refresh therefore takes about as
+long as the slowest exchange instead of the sum of all of them, and never
+much longer than SCRAPE_RUN_DEADLINE: every page fetch is bounded by the
+run's deadline (see retry_policy), and a page that runs out of time falls
+back like any other failed fetch.
+
+Exchanges are saved without publishing the consolidated snapshot (see
+snapshot_writer); it is published once at the end of the run if any
+exchange's output changed.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from urllib.parse import urlparse
+from async_http import run_sync
+from change_detection import ScrapeCounters, scrape_counters
+from http_pool import PoolStats, pool_stats
+
+# Page types fetched for every exchange, mapped to the scraper coroutine to await
+PAGE_FETCHERS = {
+    "staking": "async_fetch_staking_data",
+    "campaign": "async_fetch_campaign_data",
+}
+
+class ScrapeOrchestrator:
+    """Fetch and save several exchange scrapers concurrently"""
+
+    def __init__(self, scrapers, max_workers=None, per_host_limit=None, run_budget=None, logger=None):
+        """
+        Args:
+            scrapers (dict): Mapping of exchange name to scraper instance
+            max_workers (int, optional): Global cap on concurrent page fetches
+            per_host_limit (int, optional): Cap on concurrent page fetches per host
+            run_budget (float, optional): Seconds a run's page fetches may take in total
+            logger (logging.Logger, optional): Logger for progress messages
+        """
+        self.scrapers = scrapers
+        self.max_workers = max_workers or int(os.environ.get('SCRAPE_MAX_WORKERS', 16))
+        self.per_host_limit = per_host_limit or int(os.environ.get('SCRAPE_PER_HOST_LIMIT', 2))
+        self.run_budget = run_budget or float(os.environ.get('SCRAPE_RUN_DEADLINE', 300))
+        self.logger = logger or logging.getLogger("scrape_orchestrator")
+
+        # Fetch/parse/write work done and skipped during the latest run
+        self.last_run_counters = {}
+        # Requests of the latest run served over reused (hits) and new (misses) connections
+        self.last_run_connections = {}
+
+    @staticmethod
+    def _host(name, scraper):
+        """Return the host a scraper fetches from, the key of its concurrency cap"""
+        return urlparse(getattr(scraper, 'base_url', '') or '').netloc or name
+
+    async def _fetch_page(self, name, scraper, page_type, deadline, slots, host_slots):
+        """
+        Fetch one page type for one exchange while holding a global and a host slot.
+
+        Returns:
+            tuple: (name, page_type, offers or None, error message or None)
+        """
+        try:
+            async with slots, host_slots[self._host(name, scraper)]:
+                return name, page_type, await getattr(scraper, PAGE_FETCHERS[page_type])(deadline=deadline), None
+        except Exception as e:
+            return name, page_type, None, str(e)
+
+    def _save(self, name, scraper, pages, errors, started):
+        """Save an exchange whose pages have all been fetched and build its report entry"""
+        result = {
+            "success": False,
+            "changed": None,
+            "staking_count": len(pages.get("staking") or []),
+            "campaign_count": len(pages.get("campaign") or []),
+            "duration_seconds": None,
+            "error": None,
+        }
+
+        if errors:
+            # Keep the previous data file rather than re-fetching serially
+            result["error"] = "; ".join(errors)
+        else:
+            try:
+                result["success"] = bool(scraper.save_data(
+                    staking_data=pages["staking"],
+                    campaign_data=pages["campaign"],
+                    publish=False,
+                ))
+                if result["success"]:
+                    # Whether the normalized output differed from the last one written
+                    result["changed"] = getattr(scraper, "last_output_changed", None)
+            except Exception as e:
+                result["error"] = str(e)
+
+        result["duration_seconds"] = round(time.monotonic() - started, 3)
+        self.logger.info(
+            f"Update for {name}: {'Success' if result['success'] else 'Failed'} "
+            f"({result['staking_count']} staking offers, {result['campaign_count']} campaigns, "
+            f"{result['duration_seconds']}s)"
+        )
+        return result
+
+    def _publish(self, report):
+        """Publish the consolidated snapshot once per data directory that was written to"""
+        published = set()
+        for name, result in report.items():
+            scraper = self.scrapers[name]
+            writer = getattr(scraper, "snapshot_writer", None)
+            if not result["changed"] or writer in published:
+                continue
+            published.add(writer)
+            try:
+                scraper.publish_data()
+            except Exception as e:
+                self.logger.error(f"Error publishing snapshot after {name} update: {str(e)}")
+
+    async def _run(self, selected, started, deadline):
+        """Fetch every page of the selected exchanges concurrently, saving each exchange once its pages are in"""
+        # Created per run, on the loop that awaits them
+        slots = asyncio.Semaphore(self.max_workers)
+        host_slots = {}
+        for name, scraper in selected.items():
+            host_slots.setdefault(self._host(name, scraper), asyncio.Semaphore(self.per_host_limit))
+
+        pages = {name: {} for name in selected}
+        errors = {name: [] for name in selected}
+        report = {}
+
+        fetches = [
+            self._fetch_page(name, scraper, page_type, deadline, slots, host_slots)
+            for name, scraper in selected.items()
+            for page_type in PAGE_FETCHERS
+        ]
+        for fetched in asyncio.as_completed(fetches):
+            name, page_type, offers, error = await fetched
+            pages[name][page_type] = offers
+            if error is not None:
+                self.logger.error(f"Error fetching {page_type} data for {name}: {error}")
+                errors[name].append(f"{page_type}: {error}")
+
+            if len(pages[name]) == len(PAGE_FETCHERS):
+                # Saving hashes, records history and writes files; keep it off the loop
+                report[name] = await asyncio.to_thread(
+                    self._save, name, selected[name], pages[name], errors[name], started
+                )
+
+        await asyncio.to_thread(self._publish, report)
+        return report
+
+    def run(self, names=None):
+        """
+        Scrape and save the selected exchanges concurrently.
+
+        Args:
+            names (iterable, optional): Exchange names to refresh. Defaults to all.
+
+        Returns:
+            dict: Per-exchange report with success and changed flags, counts, duration and error
+        """
+        selected = {
+            name: scraper for name, scraper in self.scrapers.items()
+            if names is None or name in names
+        }
+        counters_before = scrape_counters.snapshot()
+        connections_before = pool_stats.stats()
+        started = time.monotonic()
+        report = run_sync(self._run(selected, started, started + self.run_budget))
+
+        self.last_run_counters = ScrapeCounters.delta(counters_before, scrape_counters.snapshot())
+        counters = self.last_run_counters
+        self.last_run_connections = PoolStats.delta(connections_before, pool_stats.stats())
+        connections = self.last_run_connections
+
+        succeeded = sum(1 for result in report.values() if result["success"])
+        self.logger.info(
+            f"Scrape run finished in {time.monotonic() - started:.1f}s: "
+            f"{succeeded}/{len(report)} exchanges updated"
+        )
+        self.logger.info(
+            f"Skipped work: {counters['parses_skipped_not_modified']} pages not modified, "
+            f"{counters['parses_skipped_unchanged_body']} identical bodies of "
+            f"{counters['pages_fetched']} fetched; {counters['writes_skipped_unchanged']} unchanged "
+            f"outputs not rewritten, {counters['writes']} written"
+        )
+        self.logger.info(
+            f"Connections: {connections['hits']} requests reused an open connection, "
+            f"{connections['misses']} opened a new one"
+        )
+        return report
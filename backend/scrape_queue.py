@@ -0,0 +1,268 @@
+"""
+Local queue handing scrape requests from the web tier to the scraper worker.
+
+Request handlers never run scrapers: /api/update and the scheduler only
+insert a job row into a SQLite database in the data directory's .state/
+folder, and the scraper worker (scraper_service, on its own or in
+background threads of the API) claims jobs in order and records their
+outcome. SQLite gives every process
+on the host the same queue without running a broker; enqueueing and
+claiming use immediate transactions, so two workers never take the same job.
+
+A job refreshes a set of exchanges, kept comma-separated in its platform
+column, or every exchange when that is NULL; the scheduler queues all the
+exchanges due at once as one job. Jobs are claimed highest priority first
+(manual requests outrank scheduled refreshes), oldest first within a
+priority. A request covered by a queued job (one for the same exchanges or
+more of them, or a full refresh) is coalesced into that job: it gets the
+existing job id, and the job takes the higher of the two priorities.
+
+A claimed job records the worker that runs it. Each worker process holds an
+exclusive lock on its own file under .state/workers/ for as long as it
+lives, so requeue_running() can tell a job whose worker exited mid-run from
+one that is still being worked on, and put only the former back in the
+queue, whichever process calls it.
+"""
+
+import os
+import json
+import uuid
+import atexit
+import sqlite3
+import threading
+import time
+
+from data_state import shared_for, state_path
+from leader_lock import LeaderLock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform TEXT,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 1,
+    requested_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    worker TEXT
+);
+"""
+
+# Columns added after the first release, created on existing databases
+MIGRATIONS = {
+    "priority": "ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0",
+    "requests": "ALTER TABLE jobs ADD COLUMN requests INTEGER NOT NULL DEFAULT 1",
+    "worker": "ALTER TABLE jobs ADD COLUMN worker TEXT",
+}
+
+INDEXES = """
+DROP INDEX IF EXISTS jobs_status;
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, id);
+"""
+
+# Job states, in the order a job goes through them
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Job priorities; higher runs first
+PRIORITY_SCHEDULED = 0
+PRIORITY_MANUAL = 10
+
+_COLUMNS = ("id", "platform", "status", "priority", "requests", "requested_at", "started_at", "finished_at", "result", "worker")
+
+def _job(row):
+    if row is None:
+        return None
+    job = dict(zip(_COLUMNS, row))
+    job["platforms"] = job["platform"].split(",") if job["platform"] else None
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+class ScrapeQueue:
+    """SQLite-backed priority queue of scrape jobs shared by the API and the scraper worker"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Database file, created on first use
+        """
+        self.path = path
+        self.workers_dir = os.path.join(os.path.dirname(path), "workers")
+        os.makedirs(self.workers_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._worker = None  # (pid, worker id, liveness lock) of this process
+        # Autocommit mode; transactions are opened explicitly where needed
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in existing:
+                self._conn.execute(statement)
+        self._conn.executescript(INDEXES)
+
+    def _transaction(self, work):
+        """Run work(connection) in an immediate transaction and return its result"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def _worker_id(self):
+        """Return this process's worker id, taking its liveness lock on first use"""
+        pid = os.getpid()
+        # A forked child gets an id of its own rather than sharing its parent's lock
+        while self._worker is None or self._worker[0] != pid:
+            worker = f"{pid}-{uuid.uuid4().hex[:12]}"
+            lock = LeaderLock(os.path.join(self.workers_dir, f"{worker}.lock"))
+            if lock.try_acquire():
+                self._worker = (pid, worker, lock)
+                atexit.register(self._release_worker, pid)
+        return self._worker[1]
+
+    def _release_worker(self, pid):
+        """Remove this process's liveness lock file at exit"""
+        if self._worker is not None and self._worker[0] == pid == os.getpid():
+            self._worker[2].release(remove=True)
+
+    def _live_workers(self):
+        """
+        Return the ids of the workers still running, removing the lock files
+        of the ones that exited without cleaning up after themselves.
+        """
+        live = {self._worker[1]} if self._worker is not None and self._worker[0] == os.getpid() else set()
+        for filename in os.listdir(self.workers_dir):
+            worker = filename[:-len(".lock")]
+            if not filename.endswith(".lock") or worker in live:
+                continue
+            lock = LeaderLock(os.path.join(self.workers_dir, filename))
+            if lock.try_acquire():
+                lock.release(remove=True)
+            else:
+                live.add(worker)
+        return live
+
+    def enqueue(self, platforms=None, priority=PRIORITY_SCHEDULED):
+        """
+        Queue a scrape of some platforms, or of every platform.
+
+        A request covered by a job that is still queued (one for the same
+        platforms or more, or a full refresh) is coalesced into that job.
+
+        Args:
+            platforms (str or iterable, optional): Exchange name or names; None for a full refresh
+            priority (int, optional): Higher priorities are claimed first
+
+        Returns:
+            int: The job id
+        """
+        if isinstance(platforms, str):
+            platforms = [platforms]
+        requested = set(platforms) if platforms is not None else None
+        platform = ",".join(sorted(requested)) if requested else None
+
+        def work(conn):
+            # Prefer a job for some of the platforms over a queued full refresh
+            rows = conn.execute(
+                "SELECT id, platform FROM jobs WHERE status = ? ORDER BY platform IS NULL, id",
+                (QUEUED,),
+            ).fetchall()
+            for job_id, queued in rows:
+                if queued is None or (requested and requested <= set(queued.split(","))):
+                    conn.execute(
+                        "UPDATE jobs SET priority = MAX(priority, ?), requests = requests + 1 WHERE id = ?",
+                        (priority, job_id),
+                    )
+                    return job_id
+            return conn.execute(
+                "INSERT INTO jobs (platform, status, priority, requested_at) VALUES (?, ?, ?, ?)",
+                (platform, QUEUED, priority, time.time()),
+            ).lastrowid
+
+        return self._transaction(work)
+
+    def claim(self):
+        """
+        Take the highest priority, oldest queued job and mark it running.
+
+        Returns:
+            dict or None: The job, or None if the queue is empty
+        """
+        worker = self._worker_id()
+
+        def work(conn):
+            job = _job(conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status = ? ORDER BY priority DESC, id LIMIT 1",
+                (QUEUED,),
+            ).fetchone())
+            if job is not None:
+                job["status"], job["started_at"], job["worker"] = RUNNING, time.time(), worker
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, worker = ? WHERE id = ?",
+                    (RUNNING, job["started_at"], worker, job["id"]),
+                )
+            return job
+
+        return self._transaction(work)
+
+    def complete(self, job_id, success, result=None):
+        """
+        Record the outcome of a claimed job.
+
+        Args:
+            job_id (int): The job id
+            success (bool): Whether the scrape succeeded
+            result (dict, optional): JSON-serializable report of the run
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ? WHERE id = ?",
+                (DONE if success else FAILED, time.time(), json.dumps(result) if result is not None else None, job_id),
+            )
+
+    def get(self, job_id):
+        """Return a job by id, or None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row)
+
+    def requeue_running(self):
+        """
+        Put jobs left running by a worker that exited back in the queue.
+
+        Jobs whose worker is still alive are left alone, so any process may
+        call this at any time. Lock files of exited workers are removed.
+
+        Returns:
+            int: Number of jobs requeued
+        """
+        with self._lock:
+            running = self._conn.execute("SELECT id, worker FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+        # Listed after the running jobs, so every worker that claimed one had its lock by then
+        live = self._live_workers()
+        orphaned = [(job_id, worker) for job_id, worker in running if worker not in live]
+        if not orphaned:
+            return 0
+
+        def work(conn):
+            # A job that finished meanwhile is no longer running and stays as it is
+            return sum(
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL, worker = NULL "
+                    "WHERE id = ? AND status = ? AND worker IS ?",
+                    (QUEUED, job_id, RUNNING, worker),
+                ).rowcount
+                for job_id, worker in orphaned
+            )
+
+        return self._transaction(work)
+
+def scrape_queue_for(data_dir):
+    """Return the shared scrape queue of a data directory"""
+    return shared_for(data_dir, "scrape_queue", lambda: ScrapeQueue(state_path(data_dir, "scrape_queue.sqlite3")))
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 """
 Dedicated server script for continuous scraping of crypto reward data
+
+This is the scraper worker. The web app (app.py) serves the snapshots it
+writes and hands update requests over through the scrape queue in the data
+directory, which this worker drains one job at a time; scheduled refreshes
+go through the same queue. It normally runs as this script, on the same
+host or volume as the web app; with SCRAPER_WORKER=embedded one web app
+process runs it in background threads instead.
 """
 
 import os
-import json
 import time
 import logging
 import threading
@@ -17,7 +23,11 @@ from scrapers.bitci import BitciScraper
 from scrapers.cointr import CoinTRScraper
 from scrapers.icrypex import ICRYPEXScraper
 from scrapers.bitay import BitayScraper
-import schedule
+from scrape_orchestrator import ScrapeOrchestrator
+from scrape_queue import DONE, FAILED, scrape_queue_for
+from leader_lock import leader_lock_for
+from refresh_schedule import refresh_schedule_for
+from circuit_breaker import circuit_breakers
 from dotenv import load_dotenv
 
 # Disable SSL warnings since we're using verify=False in our scrapers
@@ -58,70 +68,147 @@ scrapers = {
     "bitay": BitayScraper(data_dir=DATA_DIR, logs_dir=LOGS_DIR)
 }
 
+# Runs the scrapers concurrently for full refreshes
+orchestrator = ScrapeOrchestrator(scrapers, logger=logger)
+
+# Update requests from the API and the scheduler
+scrape_queue = scrape_queue_for(DATA_DIR)
+
+# Seconds between queue checks while it is empty
+QUEUE_POLL_INTERVAL = float(os.environ.get('SCRAPE_QUEUE_POLL_INTERVAL', 2))
+
+# Only one process per data directory runs the refresh schedule
+scheduler_leader = leader_lock_for(DATA_DIR, "scheduler")
+
+# Per-exchange refresh intervals, adapted to how often each one changes
+refresh_schedule = refresh_schedule_for(DATA_DIR)
+
 # Function to update all data
 def update_all_data():
     logger.info(f"Scheduled update starting at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    for name, scraper in scrapers.items():
-        try:
-            logger.info(f"Starting scrape for {name}")
-            success = scraper.save_data()
-            logger.info(f"Update for {name}: {'Success' if success else 'Failed'}")
-            
-            # Log a summary of the data
-            try:
-                filepath = os.path.join(DATA_DIR, f"{name.lower()}.json")
-                if os.path.exists(filepath):
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        staking_count = len(data.get('stakingOffers', []))
-                        campaign_count = len(data.get('campaigns', []))
-                        logger.info(f"{name} data summary: {staking_count} staking offers, {campaign_count} campaigns")
-            except Exception as e:
-                logger.error(f"Error summarizing data for {name}: {str(e)}")
-                
-        except Exception as e:
-            logger.error(f"Error updating {name}: {str(e)}")
+    report = orchestrator.run()
+    
+    # Log a summary of the data
+    for name, result in report.items():
+        if result["error"]:
+            logger.error(f"Error updating {name}: {result['error']}")
+        logger.info(f"{name} data summary: {result['staking_count']} staking offers, {result['campaign_count']} campaigns")
     
     logger.info(f"Scheduled update completed at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return report
 
-# Function to run the scheduler in a separate thread
-def run_scheduler():
-    # Get update interval from environment variables (default: 3 hours)
-    update_interval = int(os.environ.get('UPDATE_INTERVAL_HOURS', 3))
+# Function to run one queued job
+def run_job(job):
+    platforms = job["platforms"]
+    logger.info(f"Running update job {job['id']} for {', '.join(platforms) if platforms else 'all platforms'}")
     
-    # Schedule the job to run at the specified interval
-    schedule.every(update_interval).hours.do(update_all_data)
-    
-    # Add a daily full refresh at midnight
-    schedule.every().day.at("00:00").do(update_all_data)
+    try:
+        if platforms:
+            unknown = [name for name in platforms if name not in scrapers]
+            if unknown:
+                raise ValueError(f"Unknown platforms: {', '.join(unknown)}")
+            # All the job's exchanges in one concurrent run
+            report = orchestrator.run(platforms)
+        else:
+            report = update_all_data()
+        success = all(entry["success"] for entry in report.values())
+        result = {
+            "results": {name: entry["success"] for name, entry in report.items()},
+            "report": report,
+            "counters": orchestrator.last_run_counters,
+            "connections": orchestrator.last_run_connections
+        }
+    except Exception as e:
+        logger.error(f"Update job {job['id']} failed: {str(e)}")
+        success, result = False, {"error": str(e)}
     
-    logger.info(f"Scheduler set up with {update_interval}h interval and daily refresh at midnight")
+    scrape_queue.complete(job["id"], success, result)
+    logger.info(f"Update job {job['id']} {'completed' if success else 'failed'}")
+
+# Function to process queued jobs forever
+def process_queue():
+    while True:
+        job = scrape_queue.claim()
+        if job is None:
+            time.sleep(QUEUE_POLL_INTERVAL)
+            continue
+        run_job(job)
+
+# Function to queue the refreshes that are due
+def schedule_refreshes():
+    # Adapt the intervals of exchanges whose refresh has finished
+    jobs = {}
+    for name, job_id in refresh_schedule.pending().items():
+        if job_id not in jobs:
+            jobs[job_id] = scrape_queue.get(job_id)
+        job = jobs[job_id]
+        if job is not None and job["status"] not in (DONE, FAILED):
+            continue
+        entry = ((job or {}).get("result") or {}).get("report", {}).get(name, {})
+        refresh_schedule.observe(name, entry.get("changed"))
     
-    # Run the scheduler loop
+    # Everything due in this tick is refreshed together, in one run
+    due = refresh_schedule.due(scrapers)
+    if due:
+        refresh_schedule.started(due, scrape_queue.enqueue(due))
+        logger.info(f"Queued scheduled refresh of {', '.join(due)}")
+
+# Function to run the scheduler in a separate thread
+def run_scheduler():
+    # Every process runs this loop, but only the leader schedules refreshes;
+    # the others take over within a minute of the leader exiting
     while True:
-        schedule.run_pending()
+        if not scheduler_leader.is_leader and scheduler_leader.try_acquire():
+            # Continue from the state the previous leader saved
+            refresh_schedule.reload()
+            logger.info(
+                f"Scheduler leader (pid {os.getpid()}) refreshing each exchange every "
+                f"{refresh_schedule.min_interval / 60:.0f} min to {refresh_schedule.max_interval / 3600:.0f}h, "
+                f"depending on how often its data changes"
+            )
+        if scheduler_leader.is_leader:
+            requeue_interrupted()
+            schedule_refreshes()
         time.sleep(60)  # Check every minute
 
+# Function to run the jobs of exited workers again
+def requeue_interrupted():
+    # Only jobs whose worker is gone; ones still running elsewhere are left alone
+    requeued = scrape_queue.requeue_running()
+    if requeued:
+        logger.info(f"Requeued {requeued} interrupted update jobs")
+
+def start_worker():
+    """Requeue interrupted jobs and start the scheduler"""
+    # Let the API report which exchange hosts are failing fast; only the
+    # process running the queue fetches, so only it publishes
+    circuit_breakers.publish_to(DATA_DIR)
+    
+    requeue_interrupted()
+    
+    # Start the scheduler in a background thread
+    logger.info("Starting scheduler...")
+    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+    scheduler_thread.start()
+
+def start_background_worker():
+    """Run the worker in background threads, for running it inside the API process"""
+    start_worker()
+    worker_thread = threading.Thread(target=process_queue, daemon=True)
+    worker_thread.start()
+    return worker_thread
+
 def main():
     try:
         logger.info("=== Crypto Scraper Service Started ===")
         logger.info(f"Data directory: {DATA_DIR}")
         logger.info(f"Logs directory: {LOGS_DIR}")
         
-        # Run initial data update
-        logger.info("Performing initial data update...")
-        update_all_data()
-        
-        # Start the scheduler in a background thread
-        logger.info("Starting scheduler...")
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
+        start_worker()
         
-        # Keep the main thread alive
-        while True:
-            time.sleep(3600)  # Sleep for an hour
-            logger.info("Scraper service is still running")
+        # Run queued jobs in the main thread
+        process_queue()
             
     except KeyboardInterrupt:
         logger.info("Service interrupted by user")
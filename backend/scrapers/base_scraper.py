@@ -1,13 +1,14 @@
 import os
-import json
 import logging
-import requests
 from datetime import datetime
 from abc import ABC, abstractmethod
 import warnings
-import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import asyncio
+import aiohttp
+from async_http import FetchError, fetch, run_sync
+from circuit_breaker import CircuitOpenError
+from retry_policy import RetryPolicy
+from snapshot_writer import snapshot_writer_for
 
 # Suppress SSL verification warnings
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -55,75 +56,85 @@ class BaseScraper(ABC):
         self.staking_data = []
         self.campaign_data = []
         
-        # Create a session with enhanced retry capability
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=5,  # Increased from 3 to 5
-            backoff_factor=2,  # Increased from 1 to 2 for exponential backoff
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET", "POST"],  # Allow retry for both GET and POST
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
         # Mock API backup endpoints
         self.mock_api_base = "http://localhost:5001/api/mock"
     
-    def get_url(self, url, headers=None, params=None):
+    async def async_get_url(self, url, headers=None, params=None, policy=None):
         """
-        Make a GET request to the specified URL with optional headers and parameters.
-        Includes enhanced retry mechanism and better error handling.
+        Asynchronously GET the specified URL with optional headers and parameters.
+        Escalates through the same SSL/timeout strategies as get_url without
+        blocking a thread while the request is in flight.
         
         Args:
             url (str): URL to fetch
             headers (dict, optional): Request headers
             params (dict, optional): Query parameters
+            policy (RetryPolicy, optional): Attempt and deadline budget, 3 attempts by default
             
         Returns:
-            requests.Response or None: Response object or None if request fails
+            async_http.FetchResponse or None: Response object or None if request fails
         """
         if headers is None:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
         
-        max_attempts = 3
-        current_attempt = 0
-        wait_time = 1  # Start with 1 second wait
+        policy = policy or RetryPolicy(attempts=3)
+        error = "deadline exceeded before the request was sent"
         
-        while current_attempt < max_attempts:
-            current_attempt += 1
+        while policy.start_attempt():
+            current_attempt = policy.attempt
+            # First attempt: verification and normal timeout
+            # Second attempt: no verification and normal timeout
+            # Third attempt: no verification and extended timeout
+            # (all cut to the time left before the policy's deadline)
+            verify = current_attempt == 1
+            preferred_timeout = 30 if current_attempt >= 3 else 15
+            if current_attempt == 2:
+                self.logger.warning(f"Retry {current_attempt} for {url}: without SSL verification")
+            elif current_attempt == 3:
+                self.logger.warning(f"Retry {current_attempt} for {url}: without SSL verification and extended timeout")
             
-            # Try with different SSL verification strategies
             try:
-                # First attempt: Try with verification and normal timeout
-                if current_attempt == 1:
-                    response = self.session.get(url, headers=headers, params=params, timeout=15, verify=True)
-                # Second attempt: Try without verification and normal timeout
-                elif current_attempt == 2:
-                    self.logger.warning(f"Retry {current_attempt} for {url}: without SSL verification")
-                    response = self.session.get(url, headers=headers, params=params, timeout=15, verify=False)
-                # Third attempt: Try without verification and longer timeout
-                else:
-                    self.logger.warning(f"Retry {current_attempt} for {url}: without SSL verification and extended timeout")
-                    response = self.session.get(url, headers=headers, params=params, timeout=30, verify=False)
-                
+                response = await fetch(
+                    url, headers=headers, params=params, timeout=policy.timeout(preferred_timeout), verify_ssl=verify
+                )
                 response.raise_for_status()
                 return response
                 
-            except (requests.exceptions.SSLError, requests.exceptions.RequestException) as e:
-                error_type = "SSL Error" if isinstance(e, requests.exceptions.SSLError) else "Request Error"
-                self.logger.warning(f"{error_type} on attempt {current_attempt}/{max_attempts} for {url}: {str(e)}")
+            except CircuitOpenError as e:
+                # The host is known to be down; fail fast instead of retrying
+                self.logger.warning(str(e))
+                return None
                 
-                # If it's the last attempt, log the error as fatal and return None
-                if current_attempt >= max_attempts:
-                    self.logger.error(f"All attempts failed for {url}: {str(e)}")
-                    return None
+            except (aiohttp.ClientError, asyncio.TimeoutError, FetchError) as e:
+                error_type = "SSL Error" if isinstance(e, aiohttp.ClientSSLError) else "Request Error"
+                error = str(e)
+                self.logger.warning(f"{error_type} on attempt {current_attempt}/{policy.attempts} for {url}: {error}")
                 
-                # Exponential backoff
-                time.sleep(wait_time)
-                wait_time *= 2  # Double the wait time for next attempt
+                # Exponential backoff, unless no attempt or time is left for a retry
+                if not await policy.wait():
+                    break
+        
+        self.logger.error(f"All attempts failed for {url}: {error}")
+        return None
+    
+    def get_url(self, url, headers=None, params=None, deadline=None):
+        """
+        Make a GET request to the specified URL with optional headers and parameters.
+        Synchronous shim over async_get_url for scrapers that are not async yet.
+        
+        Args:
+            url (str): URL to fetch
+            headers (dict, optional): Request headers
+            params (dict, optional): Query parameters
+            deadline (float, optional): time.monotonic() by which all attempts must be over
+            
+        Returns:
+            async_http.FetchResponse or None: Response object or None if request fails
+        """
+        policy = RetryPolicy(attempts=3, deadline=deadline)
+        return run_sync(self.async_get_url(url, headers=headers, params=params, policy=policy))
     
     def get_mock_staking_data(self):
         """
@@ -132,7 +143,7 @@ class BaseScraper(ABC):
         try:
             url = f"{self.mock_api_base}/staking"
             params = {'exchange': self.exchange_name}
-            response = self.session.get(url, params=params, timeout=5)
+            response = run_sync(fetch(url, params=params, timeout=5))
             if response.status_code == 200:
                 data = response.json()
                 self.logger.info(f"Successfully fetched mock staking data for {self.exchange_name}")
@@ -151,7 +162,7 @@ class BaseScraper(ABC):
         try:
             url = f"{self.mock_api_base}/campaigns"
             params = {'exchange': self.exchange_name}
-            response = self.session.get(url, params=params, timeout=5)
+            response = run_sync(fetch(url, params=params, timeout=5))
             if response.status_code == 200:
                 data = response.json()
                 self.logger.info(f"Successfully fetched mock campaign data for {self.exchange_name}")
@@ -197,10 +208,8 @@ class BaseScraper(ABC):
                 "campaigns": self.campaign_data
             }
             
-            # Save to file
-            filename = os.path.join(self.data_dir, f"{self.exchange_name}.json")
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Save to file atomically
+            snapshot_writer_for(self.data_dir).write(self.exchange_name, data)
             
             self.logger.info(f"Successfully saved {self.exchange_name.capitalize()} data to file")
             return True
@@ -0,0 +1,124 @@
+"""
+Embedded-state extraction for exchange pages without staking cards.
+
+Many exchange pages ship their offers as JSON inside a script tag instead
+of rendering cards: a Next.js `__NEXT_DATA__` blob, a `window.__STATE__`
+style store, or a plain `stakingData = [...]` assignment. The extractor
+finds every such assignment in one linear regex scan over the raw page,
+then decodes the value in place with json.JSONDecoder.raw_decode, which
+stops exactly at the matching closing bracket. No DOM is built and no
+non-greedy `.*?` pattern has to backtrack through large bundles, and
+nested arrays are never cut short.
+"""
+
+import re
+import json
+import logging
+
+logger = logging.getLogger("embedded_state")
+
+# Whole-page state stores; the staking array is looked up inside them by key.
+# Each entry is the literal the scan looks for and the pattern that must
+# follow it, up to where the JSON value starts.
+STATE_MARKERS = {
+    "__NEXT_DATA__": re.compile(r'["\'][^>]*>\s*'),
+    "window.__": re.compile(r'(?:STATE|INITIAL_STATE|PRELOADED_STATE|NUXT)__\s*=\s*'),
+}
+# What must follow a variable name for it to be an assignment
+ASSIGNMENT = re.compile(r'\s*=(?!=)\s*')
+
+_decoder = json.JSONDecoder()
+
+def _is_identifier_char(char):
+    return char.isalnum() or char in "_$"
+
+def _find_list(value, keys):
+    """Return the first list stored under one of the keys, searching depth-first"""
+    if isinstance(value, dict):
+        for key in keys:
+            if isinstance(value.get(key), list):
+                return value[key]
+        children = value.values()
+    elif isinstance(value, list):
+        children = value
+    else:
+        return None
+
+    for child in children:
+        if isinstance(child, (dict, list)):
+            found = _find_list(child, keys)
+            if found is not None:
+                return found
+    return None
+
+class EmbeddedStateExtractor:
+    """Finds staking item arrays embedded as JSON in a page's scripts"""
+
+    def __init__(self, keys):
+        """
+        Args:
+            keys (list): Variable / property names holding staking arrays, e.g. ["stakingData"]
+        """
+        self.keys = tuple(keys)
+        # Literal-only alternation: the regex engine scans the page once and
+        # each hit is then checked with an anchored match right after it
+        literals = sorted(set(self.keys) | set(STATE_MARKERS), key=len, reverse=True)
+        self.scan = re.compile("|".join(re.escape(literal) for literal in literals))
+
+    def _value_start(self, markup, match):
+        """Return where the JSON value of a scan hit starts, or None for a false hit"""
+        literal = match.group()
+        if literal in STATE_MARKERS:
+            if literal == "__NEXT_DATA__" and markup[max(0, match.start() - 4):match.start() - 1] != "id=":
+                return None
+            tail = STATE_MARKERS[literal].match(markup, match.end())
+        else:
+            if match.start() > 0 and _is_identifier_char(markup[match.start() - 1]):
+                # Part of a longer identifier, e.g. "myStakingData ="
+                return None
+            tail = ASSIGNMENT.match(markup, match.end())
+        return tail.end() if tail else None
+
+    def iter_values(self, markup):
+        """
+        Yield every embedded value that decodes as JSON.
+
+        Args:
+            markup (str): The raw page HTML
+
+        Yields:
+            tuple: (variable name, or "state" for a state store, decoded value)
+        """
+        position = 0
+        while True:
+            match = self.scan.search(markup, position)
+            if not match:
+                return
+            position = match.end()
+            start = self._value_start(markup, match)
+            if start is None:
+                continue
+            try:
+                value, position = _decoder.raw_decode(markup, start)
+            except ValueError as e:
+                # Not JSON (e.g. a JavaScript object literal), keep scanning
+                logger.debug(f"Skipping undecodable embedded value at {start}: {e}")
+                continue
+            yield ("state" if match.group() in STATE_MARKERS else match.group()), value
+
+    def extract_items(self, markup):
+        """
+        Return the staking items of every embedded staking array, in page order.
+
+        Args:
+            markup (str): The raw page HTML
+
+        Returns:
+            list: The raw item dicts
+        """
+        items = []
+        for name, value in self.iter_values(markup):
+            found = value if isinstance(value, list) and name != "state" else _find_list(value, self.keys)
+            if found:
+                items.extend(item for item in found if isinstance(item, dict))
+        return items
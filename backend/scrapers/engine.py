@@ -0,0 +1,483 @@
+"""
+Selector-driven scraper engine shared by every exchange.
+
+Each exchange is described by a config entry in scrapers/exchanges.py
+(URLs, selector lists, embedded data keys, defaults and fallback data). The
+engine compiles those selectors and patterns once and runs the same
+fetch / parse / save pipeline for all of them, so a fix or optimization
+made here applies to every exchange at once.
+
+Pages are fetched by the async_fetch_* coroutines on the shared aiohttp
+layer (see async_http); fetch_staking_data and fetch_campaign_data are
+blocking run_sync shims over them for synchronous callers.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from functools import lru_cache
+import soupsieve
+from async_http import async_safe_request, fetch, run_sync
+from http_cache import validator_cache_for
+from change_detection import normalized_output_hash, output_hash_store_for, scrape_counters
+from snapshot_cache import notify_data_changed
+from snapshot_writer import snapshot_writer_for
+from apy_history import history_store_for
+from retry_policy import RetryPolicy
+from scrapers.html_parsing import parse_html, strainer_for
+from scrapers.embedded_state import EmbeddedStateExtractor
+from scrapers.extract import (
+    extract_amount,
+    extract_date,
+    extract_duration_days,
+    extract_percentage,
+    normalize_value,
+    split_coin_name,
+)
+
+@lru_cache(maxsize=None)
+def compile_selector(css):
+    """Return a compiled CSS selector, compiling each distinct selector only once"""
+    return soupsieve.compile(css)
+
+class CompiledSelectors:
+    """Selector lists of one page type, compiled once per exchange"""
+
+    def __init__(self, page_config):
+        """
+        Args:
+            page_config (dict): The "staking" or "campaigns" section of an exchange config
+        """
+        # Container selectors are tried in order until one matches
+        self.cards = [compile_selector(css) for css in page_config["cards"]]
+        self.fields = {field: compile_selector(css) for field, css in page_config["fields"].items()}
+
+    def select_cards(self, soup):
+        """Return the cards matched by the first container selector that finds any"""
+        for selector in self.cards:
+            cards = selector.select(soup)
+            if cards:
+                return cards
+        return []
+
+    def select_one(self, card, field):
+        return self.fields[field].select_one(card)
+
+    def select(self, card, field):
+        return self.fields[field].select(card)
+
+class ExchangeScraper:
+    """Scraper for one exchange's staking rewards and campaigns, driven by its config"""
+
+    def __init__(self, config, data_dir=None, logs_dir=None):
+        """
+        Args:
+            config (dict): Exchange config from scrapers.exchanges.EXCHANGES
+            data_dir (str, optional): Directory the exchange JSON file is written to
+            logs_dir (str, optional): Directory for the exchange log file
+        """
+        self.config = config
+        self.name = config["name"]
+        self.label = config["label"]
+
+        # Set default directories if not provided
+        self.data_dir = data_dir or "backend/data"
+        self.logs_dir = logs_dir or "backend/logs"
+
+        # Ensure data and logs directories exist
+        os.makedirs(self.data_dir, exist_ok=True)
+        os.makedirs(self.logs_dir, exist_ok=True)
+
+        # Configure logging
+        log_file = os.path.join(self.logs_dir, f"{self.name}.log")
+        self.logger = logging.getLogger(f"{self.name}_scraper")
+
+        # Only add handlers if they don't exist
+        if not self.logger.handlers:
+            self.logger.setLevel(logging.INFO)
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setFormatter(formatter)
+            self.logger.addHandler(file_handler)
+
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            self.logger.addHandler(console_handler)
+
+        self.base_url = config["base_url"]
+        self.staking_url = config["staking_url"]
+        self.campaigns_url = config["campaigns_url"]
+        self.headers = dict(config["headers"])
+        self.headers.setdefault("Origin", self.base_url)
+        self.headers.setdefault("Referer", f"{self.base_url}/")
+
+        # Selectors and the embedded data scanner, compiled once
+        self.staking_selectors = CompiledSelectors(config["staking"])
+        self.campaign_selectors = CompiledSelectors(config["campaigns"])
+        self.embedded_state = EmbeddedStateExtractor(config["staking"]["embedded_keys"])
+
+        # Only card subtrees are built when parsing
+        self.staking_strainer = strainer_for(config["staking"]["cards"])
+        self.campaign_strainer = strainer_for(config["campaigns"]["cards"])
+
+        # Validators and parsed results of previously fetched pages
+        self.page_cache = validator_cache_for(self.data_dir)
+
+        # Hashes of the last output written, to skip identical rewrites
+        self.output_hashes = output_hash_store_for(self.data_dir)
+        # Whether the latest save_data wrote new output (None before one succeeds)
+        self.last_output_changed = None
+
+        # Atomic, versioned writes of data/<exchange>.json
+        self.snapshot_writer = snapshot_writer_for(self.data_dir)
+
+        # Observed APYs, the source of apyTrend and dayChange
+        self.apy_history = history_store_for(self.data_dir)
+        # Page types whose latest fetch fell back to static data
+        self.fallback_pages = set()
+
+    async def _async_request(self, url, page_type, deadline=None):
+        """
+        Fetch a page with the exchange's configured transport.
+
+        Args:
+            deadline (float, optional): time.monotonic() by which the request must be over
+
+        Returns:
+            async_http.FetchResponse or None if the request failed
+        """
+        headers = self.page_cache.conditional_headers(url, self.headers)
+
+        if self.config["transport"] == "safe_request":
+            response, error = await async_safe_request(url, headers=headers, policy=RetryPolicy(deadline=deadline))
+            if error:
+                self.logger.error(f"Error fetching {self.label} {page_type} data: {error}")
+                return None
+            return response
+
+        # Shared keep-alive session with SSL verification disabled, a single attempt
+        policy = RetryPolicy(attempts=1, deadline=deadline)
+        if not policy.start_attempt():
+            self.logger.error(f"Error fetching {self.label} {page_type} data: deadline exceeded")
+            return None
+        return await fetch(url, headers=headers, timeout=policy.timeout(30), verify_ssl=False)
+
+    async def _async_fetch_page(self, url, page_type, parse, fallback, deadline=None):
+        """
+        Fetch, parse and cache one page, falling back to static data on failure.
+
+        Args:
+            url (str): The page URL
+            page_type (str): "staking" or "campaign", used in log messages
+            parse (callable): Turns the page HTML into a list of offers
+            fallback (callable): Returns the fallback data for this page type
+            deadline (float, optional): time.monotonic() by which the fetch must be over
+
+        Returns:
+            list: The parsed offers, a cached previous parse or the fallback data
+        """
+        self.fallback_pages.discard(page_type)
+        try:
+            self.logger.info(f"Fetching {page_type} data from {self.label}...")
+
+            response = await self._async_request(url, page_type, deadline)
+            if response is None:
+                self.logger.warning(f"No {page_type} data fetched from {self.label}, using fallback data")
+                return self._use_fallback(page_type, fallback)
+
+            # Parsing and the page cache's file I/O would stall every other
+            # request on the loop, so they run in a worker thread
+            return await asyncio.to_thread(self._process_page, url, page_type, response, parse, fallback)
+
+        except Exception as e:
+            self.logger.error(f"Error fetching {self.label} {page_type} data: {str(e)}")
+            return self._use_fallback(page_type, fallback)
+
+    def _process_page(self, url, page_type, response, parse, fallback):
+        """Turn a fetched page into offers, reusing the previous parse if it is unchanged"""
+        # Page unchanged since the last run: reuse what we parsed from it then,
+        # stamped as checked now like a fresh parse would be
+        cached = self.page_cache.reuse_if_not_modified(url, response)
+        if cached is not None:
+            self.logger.info(f"{page_type.capitalize()} page unchanged, reusing previously parsed data")
+            now = datetime.now().isoformat()
+            return [
+                dict(item, lastUpdated=now) if isinstance(item, dict) and "lastUpdated" in item else item
+                for item in cached
+            ]
+
+        if response.status_code != 200:
+            self.logger.error(f"Failed to fetch {page_type} page: {response.status_code}")
+            return self._use_fallback(page_type, fallback)
+
+        # Parse the HTML content
+        data = parse(response.text)
+
+        # If we couldn't extract any data, use fallback data
+        if not data:
+            self.logger.warning(f"No {page_type} data found on the page, using fallback data")
+            return self._use_fallback(page_type, fallback)
+
+        self.logger.info(f"Successfully fetched {page_type} data from {self.label}, found {len(data)} entries")
+        self.page_cache.store(url, response, data)
+        return data
+
+    def _use_fallback(self, page_type, fallback):
+        """Return the fallback data of a page type, remembering that it was used"""
+        self.fallback_pages.add(page_type)
+        return fallback()
+
+    async def async_fetch_staking_data(self, deadline=None):
+        """Fetch staking data from the exchange"""
+        return await self._async_fetch_page(
+            self.staking_url,
+            "staking",
+            self._parse_staking_page,
+            self._get_fallback_staking_data,
+            deadline,
+        )
+
+    async def async_fetch_campaign_data(self, deadline=None):
+        """Fetch campaign data from the exchange"""
+        return await self._async_fetch_page(
+            self.campaigns_url,
+            "campaign",
+            self._parse_campaign_page,
+            self._get_fallback_campaign_data,
+            deadline,
+        )
+
+    def fetch_staking_data(self, deadline=None):
+        """Blocking shim over async_fetch_staking_data"""
+        return run_sync(self.async_fetch_staking_data(deadline))
+
+    def fetch_campaign_data(self, deadline=None):
+        """Blocking shim over async_fetch_campaign_data"""
+        return run_sync(self.async_fetch_campaign_data(deadline))
+
+    def _parse_staking_page(self, markup):
+        """Extract staking offers from cards, or from embedded JSON data if there are none"""
+        soup = parse_html(markup, self.staking_strainer)
+        staking_cards = self.staking_selectors.select_cards(soup)
+        if staking_cards:
+            return self._parse_staking_cards(staking_cards)
+        return self._parse_embedded_data(markup)
+
+    def _parse_embedded_data(self, markup):
+        """Extract staking offers straight from the raw page's embedded JSON, without a DOM"""
+        staking_data = []
+        for item in self.embedded_state.extract_items(markup):
+            offer = self._process_staking_item(item)
+            if offer:
+                staking_data.append(offer)
+        return staking_data
+
+    def _parse_staking_cards(self, staking_cards):
+        """Extract staking offers from the matched staking cards"""
+        settings = self.config["staking"]
+        selectors = self.staking_selectors
+        staking_data = []
+
+        for card in staking_cards:
+            try:
+                # Extract coin name
+                coin_elem = selectors.select_one(card, "coin")
+                if not coin_elem:
+                    continue
+
+                # The coin symbol is usually in parentheses after the name
+                coin, symbol = split_coin_name(coin_elem.text)
+
+                # Extract APY, lockup period (in days) and minimum staking amount
+                apy_elem = selectors.select_one(card, "apy")
+                apy = (extract_percentage(apy_elem.text) if apy_elem else None) or '0.0'
+
+                lockup_elem = selectors.select_one(card, "lockup")
+                lockup_period = (extract_duration_days(lockup_elem.text) if lockup_elem else None) or '0'
+
+                min_elem = selectors.select_one(card, "min")
+                min_staking = (extract_amount(min_elem.text) if min_elem else None) or '0'
+
+                # Extract features
+                features = []
+                for elem in selectors.select(card, "features"):
+                    feature_text = elem.text.strip()
+                    if feature_text and len(feature_text) > 1:  # Avoid empty or single-char features
+                        features.append(feature_text)
+
+                staking_data.append({
+                    "coin": coin,
+                    "symbol": symbol,
+                    "apy": apy,
+                    "lockupPeriod": lockup_period,
+                    "minStaking": min_staking if min_staking != '0' else settings["default_min"].format(symbol=symbol),
+                    "features": features if features else list(settings["card_features"]),
+                    "lastUpdated": datetime.now().isoformat(),
+                    "rating": round(4.0 + (float(apy) / 20), 1),  # Generate a rating based on APY
+                    "fees": "0%"  # Default fee
+                })
+            except Exception as e:
+                self.logger.error(f"Error processing staking card: {e}")
+
+        return staking_data
+
+    def _process_staking_item(self, item):
+        """Process a staking item from JavaScript data"""
+        settings = self.config["staking"]
+        try:
+            coin = item.get('coin') or item.get('name') or item.get('coinName') or ""
+            symbol = item.get('symbol') or item.get('coinSymbol') or coin
+            apy = normalize_value(item.get('apy') or item.get('rate') or item.get('interestRate') or "0.0", extract_percentage)
+            lockup_period = normalize_value(item.get('lockupPeriod') or item.get('period') or item.get('duration') or "0", extract_duration_days)
+            min_staking = item.get('minStaking') or item.get('minAmount') or settings["default_min"].format(symbol=symbol)
+
+            # Boolean flags are mapped to feature labels, first set flag wins
+            features = item.get('features') or []
+            for flag, label in settings["script_flag_features"].items():
+                if not features and item.get(flag):
+                    features.append(label)
+
+            return {
+                "coin": coin,
+                "symbol": symbol,
+                "apy": apy,
+                "lockupPeriod": lockup_period,
+                "minStaking": min_staking,
+                "features": features if features else list(settings["script_features"]),
+                "lastUpdated": datetime.now().isoformat(),
+                "rating": round(4.0 + (float(apy) / 20), 1),
+                "fees": "0%"
+            }
+        except Exception as e:
+            self.logger.error(f"Error processing staking item: {e}")
+            return None
+
+    def _parse_campaign_page(self, markup):
+        """Extract campaigns from the matched campaign cards"""
+        settings = self.config["campaigns"]
+        selectors = self.campaign_selectors
+        campaign_data = []
+
+        soup = parse_html(markup, self.campaign_strainer)
+        for card in selectors.select_cards(soup):
+            try:
+                # Extract campaign name
+                name_elem = selectors.select_one(card, "name")
+                if not name_elem:
+                    continue
+
+                name = name_elem.text.strip()
+
+                # Extract description
+                desc_elem = selectors.select_one(card, "description")
+                description = desc_elem.text.strip() if desc_elem else ""
+
+                # Extract expiry date
+                expiry_elem = selectors.select_one(card, "expiry")
+                expiry_date = (extract_date(expiry_elem.text) if expiry_elem else None) or "Ongoing"
+
+                # Extract requirements
+                requirements = []
+                for elem in selectors.select(card, "requirements"):
+                    req_text = elem.text.strip()
+                    if req_text and "campaign" not in req_text.lower() and "promotion" not in req_text.lower():
+                        requirements.append(req_text)
+
+                # If no specific requirements found, add a default one
+                if not requirements:
+                    requirements = list(settings["default_requirements"])
+
+                # Extract reward
+                reward_elem = selectors.select_one(card, "reward")
+                reward = reward_elem.text.strip() if reward_elem else settings["default_reward"]
+
+                campaign_data.append({
+                    "name": name,
+                    "description": description,
+                    "expiryDate": expiry_date,
+                    "requirements": requirements,
+                    "reward": reward,
+                    "lastUpdated": datetime.now().isoformat()
+                })
+            except Exception as e:
+                self.logger.error(f"Error processing campaign card: {e}")
+
+        return campaign_data
+
+    def _get_fallback_staking_data(self):
+        """Return fallback staking data when live scraping fails"""
+        now = datetime.now().isoformat()
+        return [dict(offer, lastUpdated=now) for offer in self.config["fallback_staking"]]
+
+    def _get_fallback_campaign_data(self):
+        """Return fallback campaign data when live scraping fails"""
+        now = datetime.now().isoformat()
+        return [dict(campaign, lastUpdated=now) for campaign in self.config["fallback_campaigns"]]
+
+    def save_data(self, staking_data=None, campaign_data=None, publish=True):
+        """Save all data to JSON files.
+
+        Pages that were already fetched (e.g. by the scrape orchestrator)
+        can be passed in; anything missing is fetched here. With publish
+        False the file is written but the consolidated snapshot is left to a
+        later publish_data() call, which the orchestrator makes once per run.
+        """
+        try:
+            if staking_data is None:
+                staking_data = self.fetch_staking_data()
+            if campaign_data is None:
+                campaign_data = self.fetch_campaign_data()
+
+            # Only live offers become history; fallback data was never observed,
+            # and gets flat trends rather than the live offers' history
+            observed_at = time.time()
+            live = "staking" not in self.fallback_pages
+            if live:
+                self.apy_history.record(self.name, staking_data, observed_at)
+            staking_data = self.apy_history.annotate(self.name, staking_data, observed_at, live=live)
+
+            # Combine data with platform information
+            data = {
+                "platform": self.label,
+                "website": self.config["website"],
+                "logoUrl": self.config["logo_url"],
+                "stakingOffers": staking_data,
+                "campaigns": campaign_data,
+                "lastUpdated": datetime.now().isoformat()
+            }
+
+            output_file = os.path.join(self.data_dir, f"{self.name}.json")
+
+            # Skip the rewrite when nothing but timestamps changed; the file's
+            # lastUpdated values are therefore when its data last changed
+            output_hash = normalized_output_hash(data)
+            if os.path.exists(output_file) and self.output_hashes.unchanged(self.name, output_hash):
+                scrape_counters.add(writes_skipped_unchanged=1)
+                self.last_output_changed = False
+                self.logger.info(f"{self.label} data unchanged, skipping file write")
+                return True
+
+            # Save to file; readers never see a partially written snapshot
+            self.snapshot_writer.write(self.name, data, publish=False)
+
+            self.output_hashes.remember(self.name, output_hash)
+            scrape_counters.add(writes=1)
+            self.last_output_changed = True
+            self.logger.info(f"Successfully saved {self.label} data to file")
+            if publish:
+                self.publish_data()
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error saving {self.label} data: {str(e)}")
+            return False
+
+    def publish_data(self):
+        """Publish the data directory's consolidated snapshot after one or more writes"""
+        version = self.snapshot_writer.publish()
+        notify_data_changed(self.data_dir)
+        self.logger.info(f"Published snapshot v{version}")
+        return version
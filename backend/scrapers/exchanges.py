@@ -0,0 +1,605 @@
+"""
+Exchange configs for the selector-driven scraper engine.
+
+Every exchange starts from DEFAULT_CONFIG and overrides only what differs
+(URLs, selector lists, default labels, fallback data). Adding an exchange
+means adding an entry here and, if it needs a class name of its own, a
+thin subclass of ExchangeScraper.
+
+Selector lists under "cards" are tried in order until one matches; each
+field selector is a comma-separated CSS selector evaluated per card.
+"""
+
+import copy
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+DEFAULT_CONFIG = {
+    # "pooled" makes one attempt on the shared keep-alive connections, "safe_request" adds retries and SSL fallback
+    "transport": "pooled",
+    "headers": DEFAULT_HEADERS,
+    "staking": {
+        "cards": [
+            ".staking-card, .staking-container, .coin-card, .stake-item",
+            ".card, .product-card, .coin-item, .crypto-staking",
+        ],
+        "fields": {
+            "coin": ".coin-name, .asset-name, .currency-name, h3, .title",
+            "apy": ".apy, .apy-value, .apy-rate, .rate, .interest-rate",
+            "lockup": ".lockup, .period, .duration, .lock-period",
+            "min": ".minimum, .min-amount, .min-stake",
+            "features": ".feature, .tag, .badge, .label",
+        },
+        "default_min": "0.01 {symbol}",
+        "card_features": ["Flexible"],
+        # Embedded JSON data, used when the page has no staking cards: names of
+        # the script variables (or keys inside __NEXT_DATA__ / window.__STATE__)
+        # holding the staking array
+        "embedded_keys": ["stakingData"],
+        "script_flag_features": {"flexible": "Flexible", "autoRenewal": "Auto Renewal"},
+        "script_features": ["Standard Staking"],
+    },
+    "campaigns": {
+        "cards": [
+            ".campaign-card, .promotion-card, .promo-container, .campaign-container",
+            ".card, .promotion, .promo, article",
+        ],
+        "fields": {
+            "name": "h2, h3, .title, .campaign-title, .promo-title",
+            "description": "p, .description, .content, .campaign-description",
+            "expiry": ".expiry, .deadline, .end-date, .date",
+            "requirements": ".requirement, .condition, .criteria, li",
+            "reward": ".reward, .prize, .bonus",
+        },
+        "default_requirements": ["Verified Account"],
+        "default_reward": "Bonus Rewards",
+    },
+}
+
+def _merge(base, overrides):
+    """Return a deep copy of base with nested overrides applied"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def exchange_config(name, **overrides):
+    """
+    Build an exchange config from the defaults.
+
+    Args:
+        name (str): Exchange key, also the data file and logger name
+        **overrides: Top-level config keys; nested dicts are merged into the defaults
+
+    Returns:
+        dict: The complete exchange config
+    """
+    return _merge(DEFAULT_CONFIG, dict(overrides, name=name))
+
+# Exchange name -> config, in the order the API lists them
+EXCHANGES = {
+    "btcturk": exchange_config(
+        "btcturk",
+        label="BtcTurk",
+        transport="safe_request",
+        base_url="https://btcturk.com",
+        staking_url="https://btcturk.com/tr/staking",
+        campaigns_url="https://btcturk.com/tr/campaigns",
+        website="https://www.btcturk.com",
+        logo_url="/btcturk-logo.png",
+        staking={
+            "cards": [
+                ".staking-card, .staking-container, .coin-card",
+                ".card, .product-card, .coin-item",
+            ],
+        },
+        fallback_staking=[
+            {
+                "coin": "Tether",
+                "symbol": "USDT",
+                "apy": "8.0",
+                "lockupPeriod": "30",
+                "minStaking": "100 USDT",
+                "features": ["Anlık Bozma", "Günlük Ödeme"],
+                "apyTrend": [7.8, 7.9, 8.0, 8.0, 8.1, 8.0, 8.0],
+                "dayChange": "0.0",
+                "rating": 4.5,
+                "fees": "0%",
+            },
+            {
+                "coin": "Bitcoin",
+                "symbol": "BTC",
+                "apy": "4.5",
+                "lockupPeriod": "60",
+                "minStaking": "0.01 BTC",
+                "features": ["Otomatik Yenileme"],
+                "apyTrend": [4.4, 4.5, 4.5, 4.6, 4.5, 4.5, 4.5],
+                "dayChange": "0.0",
+                "rating": 4.8,
+                "fees": "0.2%",
+            },
+            {
+                "coin": "Ethereum",
+                "symbol": "ETH",
+                "apy": "5.2",
+                "lockupPeriod": "30",
+                "minStaking": "0.1 ETH",
+                "features": ["Esnek Süre"],
+                "apyTrend": [5.1, 5.2, 5.2, 5.3, 5.2, 5.2, 5.2],
+                "dayChange": "0.0",
+                "rating": 4.6,
+                "fees": "0.1%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Yeni Üye Bonusu",
+                "description": "Kayıt olun ve KYC tamamlayarak 10 USDT kazanın",
+                "expiryDate": "2023-12-31",
+                "requirements": ["Yeni Hesap", "KYC Doğrulama"],
+                "reward": "10 USDT",
+            },
+            {
+                "name": "Referans Programı",
+                "description": "Arkadaşlarınızı davet edin ve işlem ücretlerinden %50 pay alın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Doğrulanmış Hesap"],
+                "reward": "İşlem ücretlerinin %50'si",
+            },
+        ],
+    ),
+    "paribu": exchange_config(
+        "paribu",
+        label="Paribu",
+        base_url="https://paribu.com",
+        staking_url="https://paribu.com/staking",
+        campaigns_url="https://paribu.com/campaigns",
+        website="https://www.paribu.com",
+        logo_url="/paribu-logo.png",
+        staking={
+            "cards": [
+                ".staking-card, .staking-container, .coin-card, .stake-item",
+                ".card, .crypto-card, .asset-card",
+            ],
+            "fields": {
+                "coin": ".coin-name, .asset-name, .crypto-name, h3, .title, .coin",
+                "apy": ".apy, .apy-value, .rate, .interest-rate, .yield",
+                "lockup": ".lockup, .period, .duration, .term",
+                "min": ".minimum, .min-amount, .min-stake, .min",
+                "features": ".feature, .tag, .badge, .label, .benefits li",
+            },
+            "default_min": "1 {symbol}",
+            "card_features": ["Esnek Staking"],
+            "embedded_keys": ["stakingData", "STAKING_DATA", "stakingCoins"],
+            "script_flag_features": {"flexible": "Esnek", "autoRenewal": "Otomatik Yenileme"},
+            "script_features": ["Standart Staking"],
+        },
+        campaigns={
+            "cards": [
+                ".campaign-card, .promotion-card, .promo-container, .event-item",
+                ".card, .promotion, .promo, article, .event",
+            ],
+            "fields": {
+                "name": "h2, h3, .title, .campaign-title, .promo-title, .event-title",
+                "expiry": ".expiry, .deadline, .end-date, .date, .event-date",
+                "requirements": ".requirement, .condition, .criteria, li, .terms li",
+                "reward": ".reward, .prize, .bonus, .benefit",
+            },
+            "default_requirements": ["Doğrulanmış Hesap"],
+            "default_reward": "Bonus Ödüller",
+        },
+        fallback_staking=[
+            {
+                "coin": "Ethereum",
+                "symbol": "ETH",
+                "apy": "7.5",
+                "lockupPeriod": "60",
+                "minStaking": "0.1 ETH",
+                "features": ["Otomatik Yenileme"],
+                "apyTrend": [7.3, 7.4, 7.5, 7.6, 7.5, 7.5, 7.5],
+                "dayChange": "0.0",
+                "rating": 4.2,
+                "fees": "0.5%",
+            },
+            {
+                "coin": "Polkadot",
+                "symbol": "DOT",
+                "apy": "12.0",
+                "lockupPeriod": "30",
+                "minStaking": "5 DOT",
+                "features": ["Esnek Süre", "Haftalık Ödeme"],
+                "apyTrend": [11.8, 11.9, 12.0, 12.1, 12.0, 12.0, 12.0],
+                "dayChange": "0.0",
+                "rating": 4.5,
+                "fees": "0.2%",
+            },
+            {
+                "coin": "Cardano",
+                "symbol": "ADA",
+                "apy": "8.2",
+                "lockupPeriod": "45",
+                "minStaking": "100 ADA",
+                "features": ["Günlük Ödeme", "Kilitlemesiz"],
+                "apyTrend": [8.1, 8.2, 8.2, 8.3, 8.2, 8.2, 8.2],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0.1%",
+            },
+            {
+                "coin": "Avalanche",
+                "symbol": "AVAX",
+                "apy": "9.0",
+                "lockupPeriod": "30",
+                "minStaking": "1 AVAX",
+                "features": ["Otomatik Birleştirme"],
+                "apyTrend": [8.9, 9.0, 9.0, 9.1, 9.0, 9.0, 9.0],
+                "dayChange": "0.0",
+                "rating": 4.4,
+                "fees": "0.3%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Referans Programı",
+                "description": "Arkadaşlarınızı davet edin ve 6 ay boyunca işlem ücretlerinden %30 pay alın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Doğrulanmış Hesap"],
+                "reward": "İşlem ücretlerinin %30'u",
+            },
+            {
+                "name": "Trading Yarışması",
+                "description": "İşlem hacmine göre ilk 100 trader 10,000 USDT'lik ödül havuzundan pay kazanacak",
+                "expiryDate": "2023-08-31",
+                "requirements": ["Minimum 5,000 TRY işlem hacmi"],
+                "reward": "10,000 USDT'den pay",
+            },
+            {
+                "name": "Öğren & Kazan",
+                "description": "Eğitim quizlerini tamamlayarak ücretsiz kripto kazanın",
+                "expiryDate": "2023-09-15",
+                "requirements": ["Doğrulanmış Hesap", "Quiz Tamamlama"],
+                "reward": "Çeşitli token'larda 25 USDT'ye kadar",
+            },
+        ],
+    ),
+    "bitexen": exchange_config(
+        "bitexen",
+        label="Bitexen",
+        base_url="https://bitexen.com",
+        staking_url="https://bitexen.com/tr/staking",
+        campaigns_url="https://bitexen.com/tr/campaigns",
+        website="https://www.bitexen.com",
+        logo_url="/images/exchanges/bitexen-logo.png",
+        staking={
+            "cards": [
+                ".staking-card, .staking-container, .coin-card, .stake-item",
+                ".card, .product-card, .coin-item",
+            ],
+        },
+        fallback_staking=[
+            {
+                "coin": "Tether",
+                "symbol": "USDT",
+                "apy": "7.5",
+                "lockupPeriod": "30",
+                "minStaking": "100 USDT",
+                "features": ["Günlük Ödeme", "Esnek Dönem"],
+                "apyTrend": [7.4, 7.5, 7.5, 7.6, 7.5, 7.5, 7.5],
+                "dayChange": "0.0",
+                "rating": 4.4,
+                "fees": "0%",
+            },
+            {
+                "coin": "Polkadot",
+                "symbol": "DOT",
+                "apy": "11.8",
+                "lockupPeriod": "60",
+                "minStaking": "5 DOT",
+                "features": ["Otomatik Yenileme"],
+                "apyTrend": [11.7, 11.8, 11.8, 11.9, 11.8, 11.8, 11.8],
+                "dayChange": "0.0",
+                "rating": 4.6,
+                "fees": "0.1%",
+            },
+            {
+                "coin": "Chainlink",
+                "symbol": "LINK",
+                "apy": "6.2",
+                "lockupPeriod": "30",
+                "minStaking": "5 LINK",
+                "features": ["Esnek Staking"],
+                "apyTrend": [6.1, 6.2, 6.2, 6.3, 6.2, 6.2, 6.2],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0.3%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Yeni Kullanıcı Bonusu",
+                "description": "Hesabınızı oluşturun ve ilk yatırımınızı yapın, 50 TRY bonus kazanın",
+                "expiryDate": "2023-12-31",
+                "requirements": ["Yeni Hesap", "Minimum 500 TRY Yatırım"],
+                "reward": "50 TRY",
+            },
+            {
+                "name": "Kripto Getir",
+                "description": "Başka borsalardan Bitexen'e kripto transfer edin ve %1 bonus kazanın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Minimum 1000 TRY değerinde transfer"],
+                "reward": "Transfer değerinin %1'i",
+            },
+        ],
+    ),
+    "bitci": exchange_config(
+        "bitci",
+        label="Bitci",
+        base_url="https://www.bitci.com",
+        staking_url="https://www.bitci.com/tr/staking",
+        campaigns_url="https://www.bitci.com/tr/kampanyalar",
+        website="https://www.bitci.com",
+        logo_url="/images/exchanges/bitci-logo.png",
+        fallback_staking=[
+            {
+                "coin": "Bitcoin",
+                "symbol": "BTC",
+                "apy": "5.2",
+                "lockupPeriod": "30",
+                "minStaking": "0.01 BTC",
+                "features": ["Flexible", "Daily Rewards"],
+                "apyTrend": [5.1, 5.2, 5.3, 5.2, 5.2, 5.1, 5.2],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0%",
+            },
+            {
+                "coin": "Ethereum",
+                "symbol": "ETH",
+                "apy": "6.5",
+                "lockupPeriod": "60",
+                "minStaking": "0.1 ETH",
+                "features": ["Lock Period"],
+                "apyTrend": [6.4, 6.5, 6.5, 6.6, 6.5, 6.5, 6.5],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0%",
+            },
+            {
+                "coin": "Avalanche",
+                "symbol": "AVAX",
+                "apy": "8.5",
+                "lockupPeriod": "30",
+                "minStaking": "1 AVAX",
+                "features": ["Auto Renewal"],
+                "apyTrend": [8.4, 8.5, 8.6, 8.5, 8.4, 8.5, 8.5],
+                "dayChange": "0.0",
+                "rating": 4.4,
+                "fees": "0%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Hoş Geldin Kampanyası",
+                "description": "Yeni üyeler için özel komisyon indirimi ve bonus fırsatı",
+                "expiryDate": "2023-12-31",
+                "requirements": ["Yeni Kullanıcı", "KYC Onayı"],
+                "reward": "100 TL Bonus",
+            },
+            {
+                "name": "Referans Programı",
+                "description": "Arkadaşlarınızı davet edin, işlem hacimlerinden komisyon kazanın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Onaylı Hesap"],
+                "reward": "İşlem hacminin %30'u kadar komisyon",
+            },
+        ],
+    ),
+    "cointr": exchange_config(
+        "cointr",
+        label="CoinTR",
+        base_url="https://www.cointr.com",
+        staking_url="https://www.cointr.com/tr/staking",
+        campaigns_url="https://www.cointr.com/tr/campaigns",
+        website="https://www.cointr.com",
+        logo_url="/images/exchanges/cointr-logo.png",
+        fallback_staking=[
+            {
+                "coin": "Cardano",
+                "symbol": "ADA",
+                "apy": "6.8",
+                "lockupPeriod": "30",
+                "minStaking": "50 ADA",
+                "features": ["Esnek Staking", "Günlük Ödeme"],
+                "apyTrend": [6.7, 6.8, 6.9, 6.8, 6.7, 6.8, 6.8],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0%",
+            },
+            {
+                "coin": "Solana",
+                "symbol": "SOL",
+                "apy": "7.9",
+                "lockupPeriod": "60",
+                "minStaking": "1 SOL",
+                "features": ["Otomatik Yenileme"],
+                "apyTrend": [7.8, 7.9, 8.0, 7.9, 7.8, 7.9, 7.9],
+                "dayChange": "0.0",
+                "rating": 4.4,
+                "fees": "0%",
+            },
+            {
+                "coin": "Tezos",
+                "symbol": "XTZ",
+                "apy": "5.5",
+                "lockupPeriod": "0",
+                "minStaking": "10 XTZ",
+                "features": ["Esnek Dönem"],
+                "apyTrend": [5.4, 5.5, 5.6, 5.5, 5.4, 5.5, 5.5],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Yeni Üye Hoş Geldin Kampanyası",
+                "description": "Yeni üyelerimize özel işlem ücreti indirimi",
+                "expiryDate": "2023-12-31",
+                "requirements": ["Yeni Üye", "KYC Onayı"],
+                "reward": "30 Gün %50 İşlem Ücreti İndirimi",
+            },
+            {
+                "name": "Arkadaşını Getir",
+                "description": "Arkadaşlarınızı CoinTR'ye davet edin, hem siz hem arkadaşınız kazansın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Onaylı Hesap"],
+                "reward": "Arkadaşınızın işlemlerinden %20 komisyon",
+            },
+        ],
+    ),
+    "icrypex": exchange_config(
+        "icrypex",
+        label="ICRYPEX",
+        base_url="https://icrypex.com",
+        staking_url="https://icrypex.com/tr/staking",
+        campaigns_url="https://icrypex.com/tr/kampanyalar",
+        website="https://icrypex.com",
+        logo_url="/images/exchanges/icrypex-logo.png",
+        staking={
+            "cards": [
+                ".staking-card, .staking-container, .coin-card, .stake-item",
+                ".card, .product-card, .coin-item, .crypto-staking, .staking-product",
+            ],
+        },
+        fallback_staking=[
+            {
+                "coin": "Cosmos",
+                "symbol": "ATOM",
+                "apy": "9.2",
+                "lockupPeriod": "30",
+                "minStaking": "1 ATOM",
+                "features": ["Esnek Staking", "Günlük Ödeme"],
+                "apyTrend": [9.1, 9.2, 9.3, 9.2, 9.1, 9.2, 9.2],
+                "dayChange": "0.0",
+                "rating": 4.5,
+                "fees": "0%",
+            },
+            {
+                "coin": "Polkadot",
+                "symbol": "DOT",
+                "apy": "12.5",
+                "lockupPeriod": "60",
+                "minStaking": "5 DOT",
+                "features": ["Kilitli Dönem", "Otomatik Yenileme"],
+                "apyTrend": [12.4, 12.5, 12.6, 12.5, 12.4, 12.5, 12.5],
+                "dayChange": "0.0",
+                "rating": 4.6,
+                "fees": "0%",
+            },
+            {
+                "coin": "Algorand",
+                "symbol": "ALGO",
+                "apy": "7.8",
+                "lockupPeriod": "15",
+                "minStaking": "100 ALGO",
+                "features": ["Esnek Staking"],
+                "apyTrend": [7.7, 7.8, 7.9, 7.8, 7.7, 7.8, 7.8],
+                "dayChange": "0.0",
+                "rating": 4.4,
+                "fees": "0%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Yeni Üyelere Özel",
+                "description": "İlk kaydınızı tamamlayın ve 100 TL değerinde kripto kazanın",
+                "expiryDate": "2023-12-31",
+                "requirements": ["Yeni Üye", "KYC Doğrulaması"],
+                "reward": "100 TL değerinde kripto",
+            },
+            {
+                "name": "Trading Kampanyası",
+                "description": "Aylık 50.000 TL ve üzeri işlem hacmi yapın, işlem ücretlerinizden %50 indirim kazanın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Aylık minimum 50.000 TL işlem hacmi"],
+                "reward": "%50 İşlem Ücreti İndirimi",
+            },
+        ],
+    ),
+    "bitay": exchange_config(
+        "bitay",
+        label="Bitay",
+        base_url="https://www.bitay.com",
+        staking_url="https://www.bitay.com/tr/staking",
+        campaigns_url="https://www.bitay.com/tr/campaigns",
+        website="https://www.bitay.com",
+        logo_url="/images/exchanges/bitay-logo.png",
+        staking={
+            "cards": [
+                ".staking-card, .staking-container, .coin-card, .stake-item",
+                ".card, .product-card, .coin-item, .crypto-staking, .staking-product",
+            ],
+        },
+        fallback_staking=[
+            {
+                "coin": "Tezos",
+                "symbol": "XTZ",
+                "apy": "5.8",
+                "lockupPeriod": "30",
+                "minStaking": "10 XTZ",
+                "features": ["Esnek Staking", "Haftalık Ödeme"],
+                "apyTrend": [5.7, 5.8, 5.9, 5.8, 5.7, 5.8, 5.8],
+                "dayChange": "0.0",
+                "rating": 4.3,
+                "fees": "0%",
+            },
+            {
+                "coin": "Binance Coin",
+                "symbol": "BNB",
+                "apy": "8.2",
+                "lockupPeriod": "60",
+                "minStaking": "0.1 BNB",
+                "features": ["Kilitli Dönem", "Otomatik Uzatma"],
+                "apyTrend": [8.1, 8.2, 8.3, 8.2, 8.1, 8.2, 8.2],
+                "dayChange": "0.0",
+                "rating": 4.4,
+                "fees": "0%",
+            },
+            {
+                "coin": "Near Protocol",
+                "symbol": "NEAR",
+                "apy": "11.5",
+                "lockupPeriod": "30",
+                "minStaking": "5 NEAR",
+                "features": ["Esnek Staking"],
+                "apyTrend": [11.4, 11.5, 11.6, 11.5, 11.4, 11.5, 11.5],
+                "dayChange": "0.0",
+                "rating": 4.6,
+                "fees": "0%",
+            },
+        ],
+        fallback_campaigns=[
+            {
+                "name": "Para Yatırma Bonusu",
+                "description": "Hesabınıza 5.000 TL ve üzeri para yatırın, %2 bonus kazanın",
+                "expiryDate": "2023-12-31",
+                "requirements": ["5.000 TL minimum yatırım", "KYC onaylı hesap"],
+                "reward": "Yatırım miktarının %2'si kadar bonus",
+            },
+            {
+                "name": "Referans Programı",
+                "description": "Arkadaşlarınızı Bitay'a davet edin, komisyon kazanın",
+                "expiryDate": "Ongoing",
+                "requirements": ["Aktif hesap"],
+                "reward": "Arkadaşlarınızın işlem ücretlerinden %30 komisyon",
+            },
+        ],
+    ),
+}
@@ -0,0 +1,196 @@
+"""
+Field extraction helpers shared by every exchange scraper.
+
+All patterns are compiled once at import. Numbers are read the way Turkish
+exchange pages write them ("1.234,5", "%8,5", "30 gün") as well as in the
+English style ("1,234.5", "8.5%", "30 days"), and are returned with a
+plain "." decimal separator and no grouping, so APY, lockup and amount
+strings look the same whichever exchange they came from.
+"""
+
+import re
+
+# A run of digits with optional "." / "," grouping and decimal separators
+_NUMBER = r'\d+(?:[.,]\d+)*'
+
+NUMBER_PATTERN = re.compile(_NUMBER)
+# Digits grouped in threes by a single kind of separator: "1.000", "10,000", "1.000.000";
+# a leading 0 is never a group of its own, so "0.001" stays a decimal
+GROUPED_PATTERN = re.compile(r'[1-9]\d{0,2}(?:\.\d{3})+|[1-9]\d{0,2}(?:,\d{3})+')
+# "8,5 %", "8.5%" and the Turkish prefix form "%8,5"
+PERCENT_PATTERN = re.compile(rf'({_NUMBER})\s*%|%\s*({_NUMBER})')
+DURATION_PATTERN = re.compile(
+    rf'({_NUMBER})\s*(gün|gun|days|day|hafta|weeks|week|ay|months|month)',
+    re.IGNORECASE,
+)
+AMOUNT_PATTERN = re.compile(rf'({_NUMBER})\s*([A-Z]+)')
+SYMBOL_PATTERN = re.compile(r'\(([A-Z]+)\)')
+SYMBOL_SUFFIX_PATTERN = re.compile(r'\s*\([A-Z]+\)')
+DATE_PATTERN = re.compile(r'(\d{1,2})[./](\d{1,2})[./](\d{2,4})')
+
+# Days per duration unit, keyed by the unit's lowercase spelling
+_DURATION_DAYS = {
+    "gün": 1, "gun": 1, "day": 1, "days": 1,
+    "hafta": 7, "week": 7, "weeks": 7,
+    "ay": 30, "month": 30, "months": 30,
+}
+
+def normalize_number(text, grouping=True):
+    """
+    Rewrite a Turkish- or English-formatted number with a "." decimal point.
+
+    When both separators appear the last one is the decimal point
+    ("1.234,5" and "1,234.5" both give "1234.5"). With grouping, digits
+    grouped in threes by one kind of separator are digit grouping
+    ("1.000 TRY" is a thousand lira); otherwise a lone "," is a decimal
+    comma and a lone "." a decimal point.
+
+    Args:
+        text (str): The number as written on the page
+        grouping (bool): Whether three-digit groups may be digit grouping;
+            False for rates and for numbers from embedded JSON data
+
+    Returns:
+        str or None: The normalized number, or None if text is not a number
+
+    Examples:
+        >>> normalize_number("1.000")
+        '1000'
+        >>> normalize_number("10.000")
+        '10000'
+        >>> normalize_number("1,000,000")
+        '1000000'
+        >>> normalize_number("1.5")
+        '1.5'
+        >>> normalize_number("8,5")
+        '8.5'
+        >>> normalize_number("1.234,5")
+        '1234.5'
+        >>> normalize_number("12.500")
+        '12500'
+        >>> normalize_number("0.001")
+        '0.001'
+        >>> normalize_number("0,005")
+        '0.005'
+        >>> normalize_number("5.125", grouping=False)
+        '5.125'
+    """
+    text = (text or "").strip()
+    if not NUMBER_PATTERN.fullmatch(text):
+        return None
+    if grouping and GROUPED_PATTERN.fullmatch(text):
+        return text.replace('.', '').replace(',', '')
+
+    last_dot, last_comma = text.rfind('.'), text.rfind(',')
+    if last_dot >= 0 and last_comma >= 0:
+        decimal = '.' if last_dot > last_comma else ','
+    elif last_comma >= 0:
+        decimal = ',' if text.count(',') == 1 else None
+    elif last_dot >= 0:
+        decimal = '.' if text.count('.') == 1 else None
+    else:
+        return text
+
+    if decimal is None:
+        return text.replace('.', '').replace(',', '')
+    integer, _, fraction = text.rpartition(decimal)
+    return f"{integer.replace('.', '').replace(',', '')}.{fraction}"
+
+def parse_number(text):
+    """Return a Turkish- or English-formatted number as a float, or None"""
+    normalized = normalize_number(text)
+    return float(normalized) if normalized is not None else None
+
+def extract_percentage(text):
+    """
+    Find the first percentage in a text.
+
+    Rates are never in the thousands, so three decimals are read as decimals.
+
+    Returns:
+        str or None: The normalized number, e.g. "8.5" for "%8,5" or "8.5 %"
+
+    Examples:
+        >>> extract_percentage("%5,125 APY")
+        '5.125'
+    """
+    match = PERCENT_PATTERN.search(text or "")
+    if not match:
+        return None
+    return normalize_number(match.group(1) or match.group(2), grouping=False)
+
+def extract_duration_days(text):
+    """
+    Find the first duration in a text and convert it to days.
+
+    Returns:
+        str or None: Whole days, e.g. "30" for "30 gün" or "1 ay", "14" for "2 weeks"
+    """
+    match = DURATION_PATTERN.search(text or "")
+    if not match:
+        return None
+    value = parse_number(match.group(1))
+    days = value * _DURATION_DAYS[match.group(2).lower()]
+    return str(int(days)) if days == int(days) else str(round(days, 2))
+
+def extract_amount(text):
+    """
+    Find the first "<number> <CURRENCY>" amount in a text.
+
+    Returns:
+        str or None: The normalized amount, e.g. "1000.5 TRY" for "1.000,5 TRY"
+
+    Examples:
+        >>> extract_amount("Min. 0.001 BTC")
+        '0.001 BTC'
+    """
+    match = AMOUNT_PATTERN.search(text or "")
+    if not match:
+        return None
+    return f"{normalize_number(match.group(1))} {match.group(2)}"
+
+def extract_date(text):
+    """
+    Find the first day/month/year date in a text.
+
+    Returns:
+        str or None: ISO date, e.g. "2024-12-31" for "31.12.24" or "31/12/2024"
+    """
+    match = DATE_PATTERN.search(text or "")
+    if not match:
+        return None
+    day, month, year = match.groups()
+    year = f"20{year}" if len(year) == 2 else year
+    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+def split_coin_name(text):
+    """
+    Split a coin label such as "Tether (USDT)" into name and symbol.
+
+    Returns:
+        tuple: (coin, symbol); the symbol is the whole label if it has none in parentheses
+    """
+    text = (text or "").strip()
+    symbol_match = SYMBOL_PATTERN.search(text)
+    symbol = symbol_match.group(1) if symbol_match else text
+    return SYMBOL_SUFFIX_PATTERN.sub('', text).strip(), symbol
+
+def normalize_value(value, extractor):
+    """
+    Normalize a value read from embedded JavaScript data.
+
+    Plain numbers are normalized, strings are run through the given extractor
+    (e.g. extract_duration_days for "30 gün"), anything else is kept as it was.
+    JSON numbers are never digit-grouped, so three decimals stay decimals.
+
+    Returns:
+        str: The normalized value
+
+    Examples:
+        >>> normalize_value("5.125", extract_percentage)
+        '5.125'
+        >>> normalize_value(5.125, extract_percentage)
+        '5.125'
+    """
+    text = str(value).strip()
+    return normalize_number(text, grouping=False) or extractor(text) or text
@@ -0,0 +1,102 @@
+"""
+Fast HTML parsing for the scraper engine.
+
+Pages are parsed with lxml when it is installed (falling back to the
+pure-Python html.parser), and only the subtrees the engine will look at are
+built: a PageStrainer keeps the elements matched by an exchange's card
+selectors and drops everything else while parsing.
+
+Cards are kept whole, so field selectors evaluated inside a card see the
+same subtree as on a full parse. Selector lists that cannot be reduced to
+plain class and tag names disable straining for that page type.
+"""
+
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    _DEFAULT_PARSER = "lxml"
+except ImportError:
+    _DEFAULT_PARSER = "html.parser"
+
+# Tree builder used for exchange pages, overridable for troubleshooting
+HTML_PARSER = os.environ.get('SCRAPER_HTML_PARSER', _DEFAULT_PARSER)
+
+_CLASS_SELECTOR = re.compile(r'^\.(-?[_a-zA-Z][\w-]*)$')
+_TAG_SELECTOR = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)$')
+
+class PageStrainer(SoupStrainer):
+    """
+    SoupStrainer keeping top-level elements by tag name or CSS class.
+
+    Implements both the pre-4.13 (search_tag) and the 4.13+ (allow_tag_creation)
+    beautifulsoup4 strainer hooks, so it works with either release line.
+    """
+
+    def __init__(self, tag_names=(), class_names=()):
+        super().__init__()
+        self.tag_names = frozenset(tag_names)
+        self.class_names = frozenset(class_names)
+
+    def keeps(self, name, attrs):
+        """Return True if an element with this name and attributes should be built"""
+        if name in self.tag_names:
+            return True
+        classes = (attrs or {}).get("class")
+        if not classes:
+            return False
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.class_names.isdisjoint(classes)
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.keeps(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self.keeps(markup_name, markup_attrs)
+
+def strainer_for(selector_lists, extra_tags=()):
+    """
+    Build a strainer keeping every element the given card selectors can match.
+
+    Args:
+        selector_lists (list): Comma-separated CSS selector strings
+        extra_tags (iterable, optional): Tag names to keep as well (e.g. "script")
+
+    Returns:
+        PageStrainer or None: None if a selector is more than a class or tag name
+    """
+    tag_names = set(extra_tags)
+    class_names = set()
+    for selectors in selector_lists:
+        for selector in selectors.split(','):
+            selector = selector.strip()
+            class_match = _CLASS_SELECTOR.match(selector)
+            tag_match = _TAG_SELECTOR.match(selector)
+            if class_match:
+                class_names.add(class_match.group(1))
+            elif tag_match:
+                tag_names.add(tag_match.group(1).lower())
+            else:
+                return None
+    return PageStrainer(tag_names, class_names)
+
+def parse_html(markup, strainer=None):
+    """
+    Parse a page with the configured tree builder.
+
+    Args:
+        markup (str): The page HTML
+        strainer (PageStrainer, optional): Restricts which subtrees are built
+
+    Returns:
+        BeautifulSoup: The (partial) document
+    """
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=strainer)
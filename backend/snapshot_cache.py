@@ -0,0 +1,274 @@
+"""
+In-process snapshot of the exchange data files served by the rewards API.
+
+/api/rewards used to list the data directory, read and parse every
+exchange file and serialize everything again on each request, for data
+that changes every few hours. The cache below keeps the parsed data and
+the ready-to-send response bodies in memory. It is refreshed when a
+scraper in this process writes a file (notify_data_changed) or, for
+writes made by another process such as scraper_service, when the snapshot
+version bumped by snapshot_writer changes; that check reads one small file
+at most once per SNAPSHOT_CHECK_INTERVAL seconds. When the version moved,
+all exchanges are loaded from the consolidated snapshot in one read,
+decoding only the exchanges whose content digest changed. Without a
+consolidated snapshot the directory is listed instead, and only files
+whose mtime or size changed are parsed again.
+
+Each body carries a strong ETag and is compressed (gzip, and brotli when
+the module is installed) at most once per snapshot, the first time a
+client asks for that encoding.
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from data_state import existing_for, shared_for
+from snapshot_writer import read_snapshot_version
+from consolidated_snapshot import open_consolidated
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("snapshot_cache")
+
+# Content codings we can serve, in order of preference
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Seconds between data directory stat checks while no write was notified
+DEFAULT_CHECK_INTERVAL = float(os.environ.get('SNAPSHOT_CHECK_INTERVAL', 5))
+
+def serialize(payload):
+    """Encode a response payload the way Flask's jsonify does by default"""
+    return (json.dumps(payload, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # Fixed mtime keeps the gzip bytes (and so their ETag) identical across workers
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+class CachedBody:
+    """A serialized response body with its ETag and lazily built compressed variants"""
+
+    def __init__(self, data):
+        """
+        Args:
+            data (bytes): The uncompressed body
+        """
+        self.data = data
+        # Strong validator from the body itself, so every worker and restart
+        # serving the same snapshot content agrees on it
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def etag_for(self, encoding=None):
+        """Return the ETag of one representation; each content coding gets its own"""
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+    def all_etags(self):
+        return [self.etag_for(encoding) for encoding in (None,) + SUPPORTED_ENCODINGS]
+
+    def encoded(self, encoding=None):
+        """
+        Return the body in a content coding, compressing it on first use.
+
+        Args:
+            encoding (str, optional): "br", "gzip" or None for the identity coding
+
+        Returns:
+            bytes: The (compressed) body
+        """
+        if not encoding:
+            return self.data
+        body = self._encoded.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._encoded.get(encoding)
+                if body is None:
+                    body = self._encoded[encoding] = _compress(self.data, encoding)
+        return body
+
+class RewardsSnapshot:
+    """Immutable view of every exchange file at one point in time"""
+
+    def __init__(self, version, platforms, signature, data_version=0):
+        """
+        Args:
+            version (int): Increases every time the snapshot is rebuilt
+            platforms (dict): Exchange name (file stem) to parsed file data
+            signature (dict): File name to (mtime_ns, size) the data was read at,
+                empty when loaded from the consolidated snapshot
+            data_version (int, optional): On-disk snapshot version the files were read at
+        """
+        self.version = version
+        self.platforms = platforms
+        self.signature = signature
+        self.data_version = data_version
+        self.built_at = time.time()
+
+        # Response bodies are serialized once per snapshot, not per request
+        self.all_data = [platforms[name] for name in sorted(platforms)]
+        self.all_body = CachedBody(serialize({
+            "success": True,
+            "data": self.all_data,
+            "count": len(self.all_data),
+        }))
+        self.platform_bodies = {
+            name: CachedBody(serialize({"success": True, "data": data}))
+            for name, data in platforms.items()
+        }
+
+class SnapshotCache:
+    """Keeps the latest RewardsSnapshot of a data directory in memory"""
+
+    def __init__(self, data_dir, check_interval=None):
+        """
+        Args:
+            data_dir (str): Directory holding the <exchange>.json files
+            check_interval (float, optional): Seconds between mtime checks
+        """
+        self.data_dir = data_dir
+        self.check_interval = check_interval if check_interval is not None else DEFAULT_CHECK_INTERVAL
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._files = {}  # file name -> ((mtime_ns, size), parsed data)
+        self._digests = {}  # exchange name -> (consolidated snapshot digest, parsed data)
+        self._checked_at = 0.0
+        self._stale = True
+        self._version = 0
+        # On-disk snapshot version last seen, and whether every file was loaded then
+        self._data_version = None
+        self._complete = False
+
+    def invalidate(self):
+        """Force the next get() to look at the data directory again"""
+        self._stale = True
+
+    def _scan(self):
+        """Return {file name: (mtime_ns, size)} for the exchange files"""
+        signature = {}
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    signature[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+
+    def _load(self, filename, file_signature):
+        """Parse one exchange file, keeping the previous version if it cannot be read"""
+        try:
+            with open(os.path.join(self.data_dir, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # Snapshot writes are atomic, so this file was written some other
+            # way; serve what we had and retry on the next check
+            logger.error(f"Error reading {filename}: {str(e)}")
+            previous = self._files.get(filename)
+            return previous[1] if previous else None
+        self._files[filename] = (file_signature, data)
+        return data
+
+    def _rebuild(self, signature, data_version):
+        platforms = {}
+        loaded = {}
+        for filename, file_signature in signature.items():
+            cached = self._files.get(filename)
+            if cached and cached[0] == file_signature:
+                data = cached[1]
+            else:
+                data = self._load(filename, file_signature)
+            if data is not None:
+                platforms[filename[:-len(".json")]] = data
+            if filename in self._files and self._files[filename][0] == file_signature:
+                # Files that failed to parse stay out, so the next check retries them
+                loaded[filename] = file_signature
+
+        for filename in set(self._files) - set(signature):
+            del self._files[filename]
+
+        self._version += 1
+        self._complete = len(loaded) == len(signature)
+        return RewardsSnapshot(self._version, platforms, loaded, data_version)
+
+    def _rebuild_from_consolidated(self, consolidated):
+        """Build a snapshot from the consolidated snapshot, decoding only changed exchanges"""
+        platforms = {}
+        digests = {}
+        for name, digest in consolidated.digests.items():
+            cached = self._digests.get(name)
+            if digest is not None and cached and cached[0] == digest:
+                data = cached[1]
+            else:
+                data = consolidated.platform(name)
+            platforms[name] = data
+            digests[name] = (digest, data)
+        self._digests = digests
+
+        self._version += 1
+        self._complete = True
+        return RewardsSnapshot(self._version, platforms, {}, consolidated.version)
+
+    def get(self):
+        """
+        Return the current snapshot, refreshing it first if the files changed.
+
+        Returns:
+            RewardsSnapshot: The latest snapshot
+        """
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale and now - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and not self._stale and now - self._checked_at < self.check_interval:
+                return self._snapshot
+
+            stale = self._stale
+            self._stale = False
+            self._checked_at = now
+
+            # Nothing written since the last scan, and nothing left to retry
+            data_version = read_snapshot_version(self.data_dir)
+            if (self._snapshot is not None and not stale and self._complete
+                    and data_version and data_version == self._data_version):
+                return self._snapshot
+            self._data_version = data_version
+
+            consolidated = open_consolidated(self.data_dir) if data_version else None
+            if consolidated is not None and consolidated.version >= data_version:
+                self._data_version = consolidated.version
+                self._snapshot = self._rebuild_from_consolidated(consolidated)
+                logger.info(
+                    f"Rewards snapshot v{self._snapshot.version} loaded from consolidated "
+                    f"snapshot v{consolidated.version}"
+                )
+                return self._snapshot
+
+            signature = self._scan()
+            if self._snapshot is None or signature != self._snapshot.signature:
+                self._snapshot = self._rebuild(signature, data_version)
+                logger.info(
+                    f"Rewards snapshot v{self._snapshot.version} built from "
+                    f"{len(self._snapshot.platforms)} exchange files"
+                )
+            return self._snapshot
+
+def snapshot_cache_for(data_dir):
+    """Return the shared snapshot cache of a data directory"""
+    return shared_for(data_dir, "snapshot_cache", lambda: SnapshotCache(data_dir))
+
+def notify_data_changed(data_dir):
+    """Called by the scraper write path after an exchange file was rewritten"""
+    cache = existing_for(data_dir, "snapshot_cache")
+    if cache is not None:
+        cache.invalidate()
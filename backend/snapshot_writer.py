@@ -0,0 +1,183 @@
+"""
+Crash-safe writes of the data/<exchange>.json snapshot files.
+
+A file is serialized compactly to a temporary file in the same directory,
+fsynced and renamed over the old one, so a reader sees either the previous
+or the new file, never a truncated one, even if the process dies mid-write.
+
+Publishing increments a snapshot version kept in data/.state/snapshot_version
+under an exclusive file lock, so it increases monotonically across every
+process writing to the directory. Readers can compare that one small file
+against the version they last loaded instead of listing and stat'ing every
+exchange file.
+
+Under the same lock, and before the new version becomes visible, the
+writer republishes the consolidated snapshot of all exchanges
+(see consolidated_snapshot), so a reader that sees version N finds a
+consolidated snapshot of at least version N. A single write publishes right
+away; a batch of writes (a scrape run, see scrape_orchestrator) passes
+publish=False and calls publish() once at the end, so the consolidated
+snapshot is rebuilt once per run rather than once per exchange.
+"""
+
+import os
+import json
+import fcntl
+import logging
+import tempfile
+import threading
+
+from data_state import shared_for, state_path
+from consolidated_snapshot import (
+    BINARY_FILE,
+    BINARY_SUPPORTED,
+    JSON_FILE,
+    SNAPSHOT_DIR,
+    encode_binary,
+)
+
+logger = logging.getLogger("snapshot_writer")
+
+VERSION_FILE = "snapshot_version"
+
+# mkstemp creates files readable by their owner only; written files get the
+# mode a plain open() would give them, so an API running as another user on
+# a shared volume can read them. Read once at import: os.umask() can only be
+# read by setting it.
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+def _fsync_directory(directory):
+    """Persist a rename by syncing the directory entry"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_atomic(path, content):
+    """
+    Atomically replace a file with new content.
+
+    Args:
+        path (str): Destination file
+        content (bytes): The complete new file content
+    """
+    directory = os.path.dirname(path) or "."
+    # Hidden prefix and .tmp suffix keep half-written files out of *.json scans
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), FILE_MODE)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+def read_snapshot_version(data_dir):
+    """
+    Return the data directory's snapshot version.
+
+    Returns:
+        int: The version, 0 if nothing has been written through a SnapshotWriter yet
+    """
+    try:
+        with open(state_path(data_dir, VERSION_FILE), "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+class SnapshotWriter:
+    """Writes exchange snapshot files atomically and versions every write"""
+
+    def __init__(self, data_dir):
+        """
+        Args:
+            data_dir (str): Directory holding the <exchange>.json files
+        """
+        self.data_dir = data_dir
+        self.version_path = state_path(data_dir, VERSION_FILE)
+        self.snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIR)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._files = {}  # file name -> ((mtime_ns, size), parsed data)
+
+    def _load_platforms(self):
+        """Return {exchange name: data} of every exchange file, parsing only files that changed"""
+        platforms = {}
+        seen = set()
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if not (entry.name.endswith(".json") and entry.is_file()):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(entry.name)
+                if not cached or cached[0] != signature:
+                    try:
+                        with open(entry.path, "r", encoding="utf-8") as f:
+                            cached = self._files[entry.name] = (signature, json.load(f))
+                    except (OSError, ValueError) as e:
+                        logger.error(f"Error reading {entry.name}: {str(e)}")
+                        continue
+                platforms[entry.name[:-len(".json")]] = cached[1]
+                seen.add(entry.name)
+        for filename in set(self._files) - seen:
+            del self._files[filename]
+        return platforms
+
+    def _publish_consolidated(self, version):
+        """Write the consolidated JSON (and, with msgpack installed, binary) snapshot"""
+        platforms = self._load_platforms()
+        if BINARY_SUPPORTED:
+            write_atomic(os.path.join(self.snapshot_dir, BINARY_FILE), encode_binary(version, platforms))
+        payload = {"version": version, "platforms": platforms}
+        write_atomic(
+            os.path.join(self.snapshot_dir, JSON_FILE),
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        )
+
+    def publish(self):
+        """
+        Publish the consolidated snapshot and increment the snapshot version,
+        serialized across threads and processes.
+
+        Returns:
+            int: The new snapshot version
+        """
+        with self._lock, open(f"{self.version_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                version = read_snapshot_version(self.data_dir) + 1
+                self._publish_consolidated(version)
+                write_atomic(self.version_path, str(version).encode("ascii"))
+                return version
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write(self, name, data, publish=True):
+        """
+        Write one exchange's snapshot file and, by default, publish it.
+
+        Args:
+            name (str): Exchange name, the file stem
+            data (dict): The exchange data
+            publish (bool): Whether to publish right away; batches of writes
+                pass False and call publish() once afterwards
+
+        Returns:
+            int or None: The new snapshot version, None if not published
+        """
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        write_atomic(os.path.join(self.data_dir, f"{name}.json"), content)
+        return self.publish() if publish else None
+
+def snapshot_writer_for(data_dir):
+    """Return the shared snapshot writer of a data directory"""
+    return shared_for(data_dir, "snapshot_writer", lambda: SnapshotWriter(data_dir))
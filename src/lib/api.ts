@@ -13,16 +13,8 @@ const api = axios.create({
   },
 });
 
-// Generate realistic APY trend data
-const generateApyTrend = (baseApy: number): number[] => {
-  const trend: number[] = [];
-  for (let i = 0; i < 7; i++) {
-    // Add small fluctuations within +/- 10% of the base APY
-    const fluctuation = baseApy * 0.1 * (Math.random() * 2 - 1);
-    trend.push(+(baseApy + fluctuation).toFixed(2));
-  }
-  return trend;
-};
+// Mock data has no recorded history: show a flat trend at the current APY
+const flatApyTrend = (apy: number): number[] => Array(7).fill(apy);
 
 // Calculate 24h change based on the last two trend points
 const calculateDayChange = (trend: number[]): string => {
@@ -82,8 +74,8 @@ export const apiService = {
             minStaking: '100 USDT',
             features: ['Anlık Bozma', 'Günlük Ödeme'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(8.0),
-            dayChange: '0.2',
+            apyTrend: flatApyTrend(8.0),
+            dayChange: '0.0',
             rating: 4.5,
             fees: '0%',
           },
@@ -95,8 +87,8 @@ export const apiService = {
             minStaking: '0.01 BTC',
             features: ['Otomatik Yenileme'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(4.5),
-            dayChange: '-0.1',
+            apyTrend: flatApyTrend(4.5),
+            dayChange: '0.0',
             rating: 4.8,
             fees: '0.2%',
           },
@@ -108,8 +100,8 @@ export const apiService = {
             minStaking: '0.1 ETH',
             features: ['Esnek Süre'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(5.2),
-            dayChange: '0.5',
+            apyTrend: flatApyTrend(5.2),
+            dayChange: '0.0',
             rating: 4.6,
             fees: '0.1%',
           },
@@ -139,8 +131,8 @@ export const apiService = {
             minStaking: '0.1 ETH',
             features: ['Otomatik Yenileme'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(7.5),
-            dayChange: '0.3',
+            apyTrend: flatApyTrend(7.5),
+            dayChange: '0.0',
             rating: 4.2,
             fees: '0.5%',
           },
@@ -152,8 +144,8 @@ export const apiService = {
             minStaking: '1 AVAX',
             features: ['Günlük Ödeme'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(9.0),
-            dayChange: '0.5',
+            apyTrend: flatApyTrend(9.0),
+            dayChange: '0.0',
             rating: 4.4,
             fees: '0.3%',
           },
@@ -183,8 +175,8 @@ export const apiService = {
             minStaking: '50 USDT',
             features: ['Erken Bozma Seçeneği'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(8.2),
-            dayChange: '0.4',
+            apyTrend: flatApyTrend(8.2),
+            dayChange: '0.0',
             rating: 4.3,
             fees: '0.1%',
           },
@@ -196,8 +188,8 @@ export const apiService = {
             minStaking: '100 ADA',
             features: ['Flexible'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(6.5),
-            dayChange: '-0.2',
+            apyTrend: flatApyTrend(6.5),
+            dayChange: '0.0',
             rating: 4.1,
             fees: '0.2%',
           }
@@ -227,8 +219,8 @@ export const apiService = {
             minStaking: '0.005 BTC',
             features: ['Kademeli Getiri'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(4.8),
-            dayChange: '0.1',
+            apyTrend: flatApyTrend(4.8),
+            dayChange: '0.0',
             rating: 4.4,
             fees: '0.15%',
           },
@@ -240,8 +232,8 @@ export const apiService = {
             minStaking: '1000 BITCI',
             features: ['Platform Tokeni'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(12.0),
-            dayChange: '1.2',
+            apyTrend: flatApyTrend(12.0),
+            dayChange: '0.0',
             rating: 4.7,
             fees: '0%',
           }
@@ -271,8 +263,8 @@ export const apiService = {
             minStaking: '0.2 ETH',
             features: ['Haftalık Ödeme'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(5.5),
-            dayChange: '0.2',
+            apyTrend: flatApyTrend(5.5),
+            dayChange: '0.0',
             rating: 4.0,
             fees: '0.3%',
           },
@@ -284,8 +276,8 @@ export const apiService = {
             minStaking: '20 DOT',
             features: ['Esnek'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(10.5),
-            dayChange: '0.8',
+            apyTrend: flatApyTrend(10.5),
+            dayChange: '0.0',
             rating: 4.2,
             fees: '0.2%',
           }
@@ -306,8 +298,8 @@ export const apiService = {
             minStaking: '100 USDT',
             features: ['Günlük Faiz'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(7.8),
-            dayChange: '-0.3',
+            apyTrend: flatApyTrend(7.8),
+            dayChange: '0.0',
             rating: 4.1,
             fees: '0.4%',
           },
@@ -319,8 +311,8 @@ export const apiService = {
             minStaking: '2 SOL',
             features: ['Otomatik Yenileme'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(8.2),
-            dayChange: '0.6',
+            apyTrend: flatApyTrend(8.2),
+            dayChange: '0.0',
             rating: 4.3,
             fees: '0.2%',
           }
@@ -350,8 +342,8 @@ export const apiService = {
             minStaking: '0.01 BTC',
             features: ['Esnek'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(4.2),
-            dayChange: '-0.1',
+            apyTrend: flatApyTrend(4.2),
+            dayChange: '0.0',
             rating: 3.9,
             fees: '0.5%',
           },
@@ -363,8 +355,8 @@ export const apiService = {
             minStaking: '0.5 BNB',
             features: ['Kademeli Getiri'],
             lastUpdated: new Date().toISOString(),
-            apyTrend: generateApyTrend(6.8),
-            dayChange: '0.4',
+            apyTrend: flatApyTrend(6.8),
+            dayChange: '0.0',
             rating: 4.0,
             fees: '0.3%',
           }